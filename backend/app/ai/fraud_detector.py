@@ -4,117 +4,361 @@ Analyzes text content for fraud patterns using ML + keywords
 """
 
 import re
+import asyncio
+import hashlib
 import logging
-from typing import Dict, List
+import threading
+import warnings
+from collections import OrderedDict
+from typing import AbstractSet, Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+try:
+    import hyperscan  # Intel Hyperscan: SIMD multi-literal matching (x86-64 only)
+except ImportError:
+    hyperscan = None  # type: ignore[assignment]
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import re2  # google-re2: linear-time matching, no catastrophic backtracking
+except ImportError:
+    re2 = None
 
 logger = logging.getLogger(__name__)
 
 
+# Fraud data and compiled matchers are built once at import and shared by
+# every FraudDetector (and, with a preloaded app, by forked workers via COW)
+
+_FRAUD_KEYWORDS: Tuple[str, ...] = (
+    # Payment/Financial - English
+    'advance payment', 'advance', 'upfront payment', 'send money', 'transfer money',
+    'upi', 'paytm', 'phonepe', 'googlepay', 'gpay', 'payment first', 'pay now',
+    'bank transfer', 'wire transfer', 'deposit now', 'booking amount',
+
+    # Tourism/Hotel - English
+    'cheap hotel', 'hotel booking', 'cheap accommodation', 'discounted stay',
+    'limited offer', 'book now', 'hurry', 'only few left', 'last rooms',
+    'free trip', 'free stay', 'urgent booking', '70% off', '80% off', '90% off',
+    'luxury resort', 'beachfront', 'sea view', 'private pool',
+
+    # Urgency/Pressure
+    'urgent', 'immediately', 'today only', 'expires today', 'last chance',
+    'limited time', 'act now', 'don\'t miss', 'exclusive deal', 'special offer',
+
+    # Investment Scams
+    'guaranteed returns', 'double your money', 'triple your investment',
+    'risk-free', 'no risk', '100% profit', 'passive income', 'work from home',
+    'earn lakhs', 'earn crores', 'get rich quick', 'easy money',
+
+    # Marketplace/Trade
+    'cash on delivery not available', 'advance only', 'no cod',
+    'original product', 'brand new', 'sealed pack', 'factory price',
+    'wholesale price', 'dealer price', 'imported', 'usa imported',
+
+    # Contact/Communication red flags
+    'whatsapp only', 'call me', 'dm for details', 'inbox me',
+    'telegram', 'chat now', 'message for price', 'serious buyers only',
+
+    # Hindi (Devanagari)
+    'पैसे भेजो', 'एडवांस', 'बुकिंग', 'सस्ता होटल', 'मुफ्त',
+    'तुरंत', 'आज ही', 'गारंटीड', 'रिटर्न', 'पैसा कमाएं',
+
+    # Marathi (Devanagari)
+    'पैसे पाठवा', 'बुकिंग', 'स्वस्त', 'मोफत',
+
+    # Romanized Hindi/Marathi
+    'paise bhejo', 'booking karo', 'sasta hotel', 'muft',
+    'guarantee', 'paisa kamao', 'jaldi karo',
+
+    # Gambling
+    'bet', 'betting', 'satta', 'matka', 'lottery', 'jackpot',
+    'casino', 'poker', 'roulette', 'gambling', 'games', 'earn by playing',
+
+    # Prostitution (subtle detection)
+    'massage service', 'escort', 'female companion', 'full service',
+    'call girl', 'vip service', 'private service', '24/7 available',
+
+    # Fake documents
+    'fake certificate', 'duplicate', 'passport', 'driving license',
+    'aadhaar', 'pan card', 'marksheet', 'degree certificate',
+
+    # Cryptocurrency scams
+    'bitcoin', 'crypto', 'trading bot', 'forex', 'binary options',
+    'mining', 'nft', 'web3', 'pump and dump',
+)
+
+_FRAUD_PATTERNS: Tuple[Dict[str, Any], ...] = (
+    {
+        'name': 'phone_number_in_text',
+        # No \b: RE2's is ASCII-only and would accept digits glued to
+        # Devanagari letters. Word boundaries are checked in Python instead
+        'pattern': r'\+91[\s-]?[0-9]{10}|[0-9]{10}',
+        'word_bounded': True,
+        'weight': 0.2,
+        'reason': 'Contains phone number (unusual for legitimate posts)'
+    },
+    {
+        'name': 'multiple_payment_methods',
+        'pattern': r'(upi|paytm|phonepe|googlepay|gpay|bhim)',
+        'weight': 0.15,
+        'reason': 'Mentions payment methods'
+    },
+    {
+        'name': 'excessive_discounts',
+        'pattern': r'([567890]\d%\s*(off|discount))|((off|discount)\s*[567890]\d%)',
+        'weight': 0.25,
+        'reason': 'Unrealistic discount (50%+ off)'
+    },
+    {
+        'name': 'urgency_pressure',
+        'pattern': r'(urgent|hurry|limited|today only|last chance|act now)',
+        'weight': 0.2,
+        'reason': 'Urgency/pressure tactics'
+    },
+    {
+        'name': 'guaranteed_returns',
+        'pattern': r'(guaranteed|100%|risk[- ]?free|double your money)',
+        'weight': 0.3,
+        'reason': 'Unrealistic guarantees'
+    },
+)
+
+# Fraud type classification rules, highest priority first
+_FRAUD_TYPE_RULES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('hotel_booking_scam', ('hotel', 'booking', 'resort', 'stay', 'accommodation')),
+    ('investment_scam', ('investment', 'returns', 'profit', 'earn', 'income')),
+    ('gambling_scam', ('lottery', 'jackpot', 'satta', 'bet', 'casino')),
+    ('prostitution_racket', ('massage', 'escort', 'companion', 'service')),
+    ('fake_documents', ('certificate', 'passport', 'license', 'aadhaar', 'pan')),
+    ('cryptocurrency_scam', ('bitcoin', 'crypto', 'forex', 'trading')),
+    ('advance_payment_fraud', ('advance', 'payment', 'upi', 'transfer')),
+)
+
+
+def _build_keyword_database(keywords: Dict[str, int]) -> Any:
+    """
+    Compile the deduplicated keywords into a Hyperscan literal database.
+    Patterns are the keywords' UTF-8 bytes as \\xHH escapes, so they match
+    literally against the lowercased text bytes; ids are keyword indices.
+    Returns None when hyperscan is not installed or compilation fails.
+    """
+    if hyperscan is None:
+        return None
+
+    expressions = [
+        ''.join(f'\\x{byte:02x}' for byte in keyword.encode('utf-8')).encode('ascii')
+        for keyword in keywords
+    ]
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=expressions,
+            ids=list(keywords.values()),
+            elements=len(expressions),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions)
+        )
+    except hyperscan.error as e:
+        logger.warning(f"Hyperscan could not compile fraud keywords, using Aho-Corasick: {e}")
+        return None
+
+    return database
+
+
+def _build_keyword_automaton(keywords: Dict[str, int]) -> Any:
+    """
+    Build an Aho-Corasick automaton over the deduplicated, lowercased keywords
+    so a single pass over the text finds every keyword hit.
+    Returns None when pyahocorasick is not installed.
+    """
+    if ahocorasick is None:
+        logger.debug("pyahocorasick not installed, using substring keyword scan")
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for keyword, idx in keywords.items():
+        automaton.add_word(keyword, idx)
+    automaton.make_automaton()
+    return automaton
+
+
+def _build_fused_pattern(patterns: Tuple[Dict[str, Any], ...]) -> Any:
+    """
+    Combine all fraud patterns into one case-insensitive alternation.
+    Each pattern becomes a named group, so m.lastgroup tells which fired.
+    Compiled with RE2 when available (scraped HTML is untrusted input),
+    otherwise with Python's re.
+    """
+    alternation = '(?i)' + '|'.join(f"(?P<{p['name']}>{p['pattern']})" for p in patterns)
+
+    if re2 is not None:
+        try:
+            return re2.compile(alternation)
+        except re2.error as e:
+            logger.warning(f"RE2 could not compile fraud patterns, using re: {e}")
+
+    return re.compile(alternation)
+
+
+def _is_word_char(char: str) -> bool:
+    """Unicode word character, as Python's re \\w defines it"""
+    return char.isalnum() or char == '_'
+
+
+def _is_word_bounded(text: str, match: Any) -> bool:
+    """True if the match has no word character directly before or after it"""
+    start, end = match.span()
+    if start > 0 and _is_word_char(text[start - 1]):
+        return False
+    return end == len(text) or not _is_word_char(text[end])
+
+
+def _build_fraud_type_keysets(keywords: Tuple[str, ...]) -> Tuple[Tuple[str, FrozenSet[str]], ...]:
+    """
+    Precompute, per fraud type in priority order, the frozenset of fraud
+    keywords that indicate it, so classifying a post is set intersection.
+    Each keyword belongs to the first rule whose terms it contains.
+    """
+    type_keywords: Dict[str, Set[str]] = {fraud_type: set() for fraud_type, _ in _FRAUD_TYPE_RULES}
+
+    for keyword in keywords:
+        keyword_lower = keyword.lower()
+        for fraud_type, terms in _FRAUD_TYPE_RULES:
+            if any(term in keyword_lower for term in terms):
+                type_keywords[fraud_type].add(keyword)
+                break
+
+    return tuple((fraud_type, frozenset(type_keywords[fraud_type])) for fraud_type, _ in _FRAUD_TYPE_RULES)
+
+
+# Lowercased keyword -> index of its first occurrence; keywords listed under
+# several languages (e.g. 'बुकिंग') are matched once
+_KEYWORD_FIRST_INDEX: Dict[str, int] = {}
+for _idx, _keyword in enumerate(_FRAUD_KEYWORDS):
+    _KEYWORD_FIRST_INDEX.setdefault(_keyword.lower(), _idx)
+del _idx, _keyword
+
+# Texts shorter than the shortest keyword can't contain any keyword
+_MIN_KEYWORD_LENGTH: int = min(len(k) for k in _KEYWORD_FIRST_INDEX)
+
+# UTF-8 is self-synchronising, so a byte substring hit is a real character
+# hit; bytes search avoids walking multi-byte Devanagari text code point by
+# code point
+_FALLBACK_KEYWORDS: Tuple[Tuple[bytes, str], ...] = tuple(
+    (keyword.encode('utf-8'), _FRAUD_KEYWORDS[idx]) for keyword, idx in _KEYWORD_FIRST_INDEX.items()
+)
+
+# Keyword matcher tiers: Hyperscan, then Aho-Corasick, then byte scan
+_KEYWORD_DATABASE: Any = _build_keyword_database(_KEYWORD_FIRST_INDEX)
+_KEYWORD_SCRATCH: Any = hyperscan.Scratch(_KEYWORD_DATABASE) if _KEYWORD_DATABASE else None
+_KEYWORD_AUTOMATON: Any = None if _KEYWORD_DATABASE else _build_keyword_automaton(_KEYWORD_FIRST_INDEX)
+
+_FUSED_PATTERN: Any = _build_fused_pattern(_FRAUD_PATTERNS)
+
+# Scoring tables in pattern-list order, looked up by the fused pattern's
+# outer group number (m.lastindex) instead of by name
+_PATTERN_NAMES: Tuple[str, ...] = tuple(p['name'] for p in _FRAUD_PATTERNS)
+_PATTERN_WEIGHTS: Tuple[float, ...] = tuple(p['weight'] for p in _FRAUD_PATTERNS)
+_GROUP_TO_PATTERN: Dict[int, int] = {
+    _FUSED_PATTERN.groupindex[name]: idx for idx, name in enumerate(_PATTERN_NAMES)
+}
+# Groups whose match must not touch a word character on either side
+_WORD_BOUNDED_GROUPS: FrozenSet[int] = frozenset(
+    _FUSED_PATTERN.groupindex[p['name']] for p in _FRAUD_PATTERNS if p.get('word_bounded')
+)
+
+_FRAUD_TYPE_KEYSETS: Tuple[Tuple[str, FrozenSet[str]], ...] = _build_fraud_type_keysets(_FRAUD_KEYWORDS)
+
+# Hyperscan scratch space can't be shared between threads
+_scratch_local = threading.local()
+
+
+def _get_keyword_scratch() -> Any:
+    """Return this thread's Hyperscan scratch, cloning one on first use"""
+    scratch = getattr(_scratch_local, 'scratch', None)
+    if scratch is None:
+        scratch = _KEYWORD_SCRATCH.clone()
+        _scratch_local.scratch = scratch
+    return scratch
+
+
 class FraudDetector:
     """
     Hybrid ML + Keyword fraud detection system
     """
 
-    def __init__(self):
-        self.fraud_keywords = self._load_fraud_keywords()
-        self.fraud_patterns = self._load_fraud_patterns()
-
-    def _load_fraud_keywords(self) -> List[str]:
-        """Load comprehensive fraud keyword list"""
-        return [
-            # Payment/Financial - English
-            'advance payment', 'advance', 'upfront payment', 'send money', 'transfer money',
-            'upi', 'paytm', 'phonepe', 'googlepay', 'gpay', 'payment first', 'pay now',
-            'bank transfer', 'wire transfer', 'deposit now', 'booking amount',
-
-            # Tourism/Hotel - English
-            'cheap hotel', 'hotel booking', 'cheap accommodation', 'discounted stay',
-            'limited offer', 'book now', 'hurry', 'only few left', 'last rooms',
-            'free trip', 'free stay', 'urgent booking', '70% off', '80% off', '90% off',
-            'luxury resort', 'beachfront', 'sea view', 'private pool',
-
-            # Urgency/Pressure
-            'urgent', 'immediately', 'today only', 'expires today', 'last chance',
-            'limited time', 'act now', 'don\'t miss', 'exclusive deal', 'special offer',
-
-            # Investment Scams
-            'guaranteed returns', 'double your money', 'triple your investment',
-            'risk-free', 'no risk', '100% profit', 'passive income', 'work from home',
-            'earn lakhs', 'earn crores', 'get rich quick', 'easy money',
-
-            # Marketplace/Trade
-            'cash on delivery not available', 'advance only', 'no cod',
-            'original product', 'brand new', 'sealed pack', 'factory price',
-            'wholesale price', 'dealer price', 'imported', 'usa imported',
-
-            # Contact/Communication red flags
-            'whatsapp only', 'call me', 'dm for details', 'inbox me',
-            'telegram', 'chat now', 'message for price', 'serious buyers only',
-
-            # Hindi (Devanagari)
-            'पैसे भेजो', 'एडवांस', 'बुकिंग', 'सस्ता होटल', 'मुफ्त',
-            'तुरंत', 'आज ही', 'गारंटीड', 'रिटर्न', 'पैसा कमाएं',
-
-            # Marathi (Devanagari)
-            'पैसे पाठवा', 'बुकिंग', 'स्वस्त', 'मोफत',
-
-            # Romanized Hindi/Marathi
-            'paise bhejo', 'booking karo', 'sasta hotel', 'muft',
-            'guarantee', 'paisa kamao', 'jaldi karo',
-
-            # Gambling
-            'bet', 'betting', 'satta', 'matka', 'lottery', 'jackpot',
-            'casino', 'poker', 'roulette', 'gambling', 'games', 'earn by playing',
-
-            # Prostitution (subtle detection)
-            'massage service', 'escort', 'female companion', 'full service',
-            'call girl', 'vip service', 'private service', '24/7 available',
-
-            # Fake documents
-            'fake certificate', 'duplicate', 'passport', 'driving license',
-            'aadhaar', 'pan card', 'marksheet', 'degree certificate',
-
-            # Cryptocurrency scams
-            'bitcoin', 'crypto', 'trading bot', 'forex', 'binary options',
-            'mining', 'nft', 'web3', 'pump and dump',
-        ]
-
-    def _load_fraud_patterns(self) -> List[Dict]:
-        """Load regex patterns for fraud detection"""
-        return [
-            {
-                'name': 'phone_number_in_text',
-                'pattern': r'\b\d{10}\b|\b\+91[\s-]?\d{10}\b',
-                'weight': 0.2,
-                'reason': 'Contains phone number (unusual for legitimate posts)'
-            },
-            {
-                'name': 'multiple_payment_methods',
-                'pattern': r'(upi|paytm|phonepe|googlepay|gpay|bhim)',
-                'weight': 0.15,
-                'reason': 'Mentions payment methods'
-            },
-            {
-                'name': 'excessive_discounts',
-                'pattern': r'([567890]\d%\s*(off|discount))|((off|discount)\s*[567890]\d%)',
-                'weight': 0.25,
-                'reason': 'Unrealistic discount (50%+ off)'
-            },
-            {
-                'name': 'urgency_pressure',
-                'pattern': r'(urgent|hurry|limited|today only|last chance|act now)',
-                'weight': 0.2,
-                'reason': 'Urgency/pressure tactics'
-            },
-            {
-                'name': 'guaranteed_returns',
-                'pattern': r'(guaranteed|100%|risk[- ]?free|double your money)',
-                'weight': 0.3,
-                'reason': 'Unrealistic guarantees'
-            },
-        ]
-
-    async def analyze_text(self, text: str) -> Dict:
+    def __init__(self, cache_size: int = 8192):
+        """
+        Args:
+            cache_size: Number of recent analysis results kept, keyed by content
+                hash (scraped ad copy repeats across pages and accounts)
+        """
+        self.cache_size: int = cache_size
+        self._result_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        # analyze_texts runs in a worker thread while analyze_text may run on the loop
+        self._cache_lock = threading.Lock()
+        self.fraud_keywords: Tuple[str, ...] = _FRAUD_KEYWORDS
+        self.fraud_patterns: Tuple[Dict[str, Any], ...] = _FRAUD_PATTERNS
+        self._min_keyword_length: int = _MIN_KEYWORD_LENGTH
+        self._fallback_keywords: Tuple[Tuple[bytes, str], ...] = _FALLBACK_KEYWORDS
+        self._keyword_database: Any = _KEYWORD_DATABASE
+        self._keyword_automaton: Any = _KEYWORD_AUTOMATON
+        self._fused_pattern: Any = _FUSED_PATTERN
+        self._pattern_names: Tuple[str, ...] = _PATTERN_NAMES
+        self._pattern_weights: Tuple[float, ...] = _PATTERN_WEIGHTS
+        self._group_to_pattern: Dict[int, int] = _GROUP_TO_PATTERN
+        self._word_bounded_groups: FrozenSet[int] = _WORD_BOUNDED_GROUPS
+        self._fraud_type_keysets: Tuple[Tuple[str, FrozenSet[str]], ...] = _FRAUD_TYPE_KEYSETS
+
+    def _match_keywords(self, text_lower: str) -> List[str]:
+        """Return matched keywords in keyword-list order"""
+        if len(text_lower) < self._min_keyword_length:
+            return []
+
+        if self._keyword_database is not None:
+            hits: Set[int] = set()
+
+            def on_match(idx: int, start: int, end: int, flags: int, context: Any) -> None:
+                hits.add(idx)
+
+            self._keyword_database.scan(
+                text_lower.encode('utf-8'),
+                match_event_handler=on_match,
+                scratch=_get_keyword_scratch()
+            )
+            return [self.fraud_keywords[idx] for idx in sorted(hits)]
+
+        if self._keyword_automaton is None:
+            text_bytes = text_lower.encode('utf-8')
+            return [
+                keyword for keyword_bytes, keyword in self._fallback_keywords
+                if keyword_bytes in text_bytes
+            ]
+
+        hits = {idx for _, idx in self._keyword_automaton.iter(text_lower)}
+        return [self.fraud_keywords[idx] for idx in sorted(hits)]
+
+    def _match_patterns(self, text: str) -> List[int]:
+        """Return indices of matched patterns in pattern-list order"""
+        group_to_pattern = self._group_to_pattern
+        seen: Set[int] = set()
+        pos: int = 0
+        while len(seen) < len(group_to_pattern):
+            match = self._fused_pattern.search(text, pos)
+            if not match:
+                break
+            if match.lastindex not in self._word_bounded_groups or _is_word_bounded(text, match):
+                seen.add(group_to_pattern[match.lastindex])
+            # Resume just after the match start so overlapping indicators
+            # (e.g. '100%' inside '100% off') are still reported
+            pos = match.start() + 1
+
+        return sorted(seen)
+
+    def analyze_text(self, text: str) -> Dict[str, Any]:
         """
         Analyze text for fraud indicators
         Returns:
@@ -137,26 +381,29 @@ class FraudDetector:
                 'reasoning': 'No content to analyze'
             }
 
+        cache_key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+        cached = self._get_cached_result(cache_key)
+        if cached is not None:
+            logger.debug("Fraud analysis cache hit")
+            return cached
+
         text_lower = text.lower()
 
         # 1. Keyword matching
-        matched_keywords = []
-        for keyword in self.fraud_keywords:
-            if keyword.lower() in text_lower:
-                matched_keywords.append(keyword)
+        matched_keywords = self._match_keywords(text_lower)
 
         keyword_score = min(len(matched_keywords) * 0.15, 0.6)  # Max 0.6 from keywords
 
         # 2. Pattern matching
-        matched_patterns = []
-        pattern_score = 0.0
+        pattern_ids = self._match_patterns(text)
+        pattern_names = self._pattern_names
+        pattern_weights = self._pattern_weights
+        matched_patterns = [pattern_names[idx] for idx in pattern_ids]
+        pattern_score: float = 0.0
 
-        for pattern_dict in self.fraud_patterns:
-            pattern = pattern_dict['pattern']
-            if re.search(pattern, text_lower):
-                matched_patterns.append(pattern_dict['name'])
-                pattern_score += pattern_dict['weight']
-                logger.debug(f"Pattern matched: {pattern_dict['name']} (+{pattern_dict['weight']})")
+        for idx in pattern_ids:
+            pattern_score += pattern_weights[idx]
+            logger.debug(f"Pattern matched: {pattern_names[idx]} (+{pattern_weights[idx]})")
 
         pattern_score = min(pattern_score, 0.4)  # Max 0.4 from patterns
 
@@ -173,7 +420,7 @@ class FraudDetector:
             risk_level = 'LOW'
 
         # 5. Classify fraud type
-        fraud_type = self._classify_fraud_type(matched_keywords, text_lower)
+        fraud_type = self._classify_fraud_type(set(matched_keywords), text_lower)
 
         # 6. Generate reasoning
         reasoning = self._generate_reasoning(matched_keywords, matched_patterns, fraud_score)
@@ -181,7 +428,7 @@ class FraudDetector:
         logger.info(f"Fraud analysis: Score={fraud_score:.3f}, Risk={risk_level}, Type={fraud_type}")
         logger.info(f"  Keywords: {len(matched_keywords)}, Patterns: {len(matched_patterns)}")
 
-        return {
+        result = {
             'fraud_score': fraud_score,
             'risk_level': risk_level,
             'fraud_type': fraud_type,
@@ -189,27 +436,71 @@ class FraudDetector:
             'matched_patterns': matched_patterns,
             'reasoning': reasoning
         }
+        self._store_cached_result(cache_key, result)
+
+        return result
+
+    async def analyze_text_async(self, text: str) -> Dict[str, Any]:
+        """
+        Deprecated: analyze_text() is synchronous and CPU-only, call it directly.
+        Runs analyze_text() in a worker thread.
+        """
+        warnings.warn(
+            "FraudDetector.analyze_text_async() is deprecated; call analyze_text() directly",
+            DeprecationWarning,
+            stacklevel=2
+        )
+        return await asyncio.to_thread(self.analyze_text, text)
+
+    async def analyze_texts(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze a batch of texts in one worker thread
+
+        Results are returned in input order, same format as analyze_text().
+        """
+        if not texts:
+            return []
+
+        analyze = self.analyze_text
+        return await asyncio.to_thread(lambda: [analyze(text) for text in texts])
+
+    def _get_cached_result(self, cache_key: bytes) -> Optional[Dict[str, Any]]:
+        """Return a copy of a cached result (LRU), or None on miss"""
+        with self._cache_lock:
+            cached = self._result_cache.get(cache_key)
+            if cached is None:
+                return None
+
+            self._result_cache.move_to_end(cache_key)
+        return self._copy_result(cached)
+
+    def _store_cached_result(self, cache_key: bytes, result: Dict[str, Any]) -> None:
+        """Cache a copy of the result, evicting the least recently used entry"""
+        if self.cache_size <= 0:
+            return
+
+        cached = self._copy_result(result)
+        with self._cache_lock:
+            self._result_cache[cache_key] = cached
+            if len(self._result_cache) > self.cache_size:
+                self._result_cache.popitem(last=False)
+
+    def _copy_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a result so callers can't mutate cached lists"""
+        return {
+            **result,
+            'matched_keywords': list(result['matched_keywords']),
+            'matched_patterns': list(result['matched_patterns']),
+        }
 
-    def _classify_fraud_type(self, keywords: List[str], text: str) -> str:
+    def _classify_fraud_type(self, keywords: AbstractSet[str], text: str) -> str:
         """Classify the type of fraud based on keywords and text"""
-        keyword_str = ' '.join(keywords).lower()
-
-        if any(k in keyword_str for k in ['hotel', 'booking', 'resort', 'stay', 'accommodation']):
-            return 'hotel_booking_scam'
-        elif any(k in keyword_str for k in ['investment', 'returns', 'profit', 'earn', 'income']):
-            return 'investment_scam'
-        elif any(k in keyword_str for k in ['lottery', 'jackpot', 'satta', 'bet', 'casino']):
-            return 'gambling_scam'
-        elif any(k in keyword_str for k in ['massage', 'escort', 'companion', 'service']):
-            return 'prostitution_racket'
-        elif any(k in keyword_str for k in ['certificate', 'passport', 'license', 'aadhaar', 'pan']):
-            return 'fake_documents'
-        elif any(k in keyword_str for k in ['bitcoin', 'crypto', 'forex', 'trading']):
-            return 'cryptocurrency_scam'
-        elif any(k in keyword_str for k in ['advance', 'payment', 'upi', 'transfer']):
-            return 'advance_payment_fraud'
-        else:
-            return 'suspicious_content'
+        # Highest-priority fraud type among the matched keywords wins
+        for fraud_type, type_keywords in self._fraud_type_keysets:
+            if not type_keywords.isdisjoint(keywords):
+                return fraud_type
+
+        return 'suspicious_content'
 
     def _generate_reasoning(self, keywords: List[str], patterns: List[str], score: float) -> str:
         """Generate human-readable reasoning for the fraud score"""
@@ -234,7 +525,7 @@ class FraudDetector:
 
 
 # Test function
-async def test_fraud_detector():
+def test_fraud_detector():
     """Test the fraud detector with sample texts"""
     detector = FraudDetector()
 
@@ -251,7 +542,7 @@ async def test_fraud_detector():
 
     for idx, text in enumerate(test_cases, 1):
         print(f"\nTest {idx}: {text}")
-        result = await detector.analyze_text(text)
+        result = detector.analyze_text(text)
         print(f"  Score: {result['fraud_score']:.3f}")
         print(f"  Risk: {result['risk_level']}")
         print(f"  Type: {result['fraud_type']}")
@@ -263,6 +554,5 @@ async def test_fraud_detector():
 
 
 if __name__ == "__main__":
-    import asyncio
     logging.basicConfig(level=logging.INFO)
-    asyncio.run(test_fraud_detector())
+    test_fraud_detector()
@@ -3,14 +3,37 @@ GPT-4 HTML-based Fraud Detector
 Analyzes Facebook post HTML directly (faster & cheaper than vision)
 Uses GPT-4 text API instead of vision API
 """
+import asyncio
+import hashlib
 import logging
-from typing import Dict
-import json
+from collections import OrderedDict
+from html import unescape
+from typing import Dict, List
+import orjson
 import os
 import re
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+from app.ai.openai_client import HAS_OPENAI, create_chat_completion, get_openai_client, warmup_openai_client
+
 logger = logging.getLogger(__name__)
 
+# Regex fallback for _clean_html when selectolax isn't installed
+_SCRIPT_RE = re.compile(r'<script[^>]*>.*?</script>', re.DOTALL | re.IGNORECASE)
+_STYLE_RE = re.compile(r'<style[^>]*>.*?</style>', re.DOTALL | re.IGNORECASE)
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# Runs of whitespace (newlines, indentation, nbsp) collapse to one space
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Non-visible elements dropped before extracting post text
+_STRIP_SELECTOR = 'script, style, template, noscript'
+
 
 class GPTHTMLFraudDetector:
     """
@@ -19,18 +42,27 @@ class GPTHTMLFraudDetector:
     MUCH faster and cheaper than vision API
     """
 
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, cache_size: int = 4096):
         """
         Initialize GPT-4 HTML detector
 
         Args:
             api_key: OpenAI API key (or set OPENAI_API_KEY env var)
+            cache_size: Number of GPT results kept, keyed by cleaned post hash
         """
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.cache_size = cache_size
+        self._result_cache: "OrderedDict[bytes, Dict]" = OrderedDict()
 
         if not self.api_key:
             logger.warning("No OpenAI API key provided. Set OPENAI_API_KEY environment variable.")
 
+    async def warmup(self) -> bool:
+        """Pre-open the pooled API connection so the first analysis skips the handshake"""
+        if not self.api_key:
+            return False
+        return await warmup_openai_client(self.api_key)
+
     async def analyze_post_html(self, html: str) -> Dict:
         """
         Analyze Facebook post content for fraud
@@ -56,16 +88,13 @@ class GPTHTMLFraudDetector:
             logger.error("OpenAI API key not configured")
             return self._fallback_analysis()
 
-        try:
-            # Import OpenAI library
-            try:
-                from openai import OpenAI
-            except ImportError:
-                logger.error("OpenAI library not installed. Run: pip install openai")
-                return self._fallback_analysis()
+        if not HAS_OPENAI:
+            logger.error("OpenAI library not installed. Run: pip install openai")
+            return self._fallback_analysis()
 
-            # Initialize OpenAI client
-            client = OpenAI(api_key=self.api_key)
+        try:
+            # Shared OpenAI client (reuses pooled connections)
+            client = get_openai_client(self.api_key)
 
             # Clean HTML (remove script tags, truncate if too long)
             cleaned_html = self._clean_html(html)
@@ -74,13 +103,22 @@ class GPTHTMLFraudDetector:
                 logger.warning(f"HTML too short after cleaning: {len(cleaned_html)} chars")
                 return self._fallback_analysis()
 
+            # Same ad text is reposted across pages - skip the paid call
+            cache_key = hashlib.blake2b(cleaned_html.encode('utf-8'), digest_size=16).digest()
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+                logger.info("GPT-4 HTML analysis cache hit")
+                return self._copy_result(cached)
+
             # Build prompt
             prompt = self._build_fraud_prompt(cleaned_html)
 
             logger.info("Sending HTML to GPT-4 for analysis...")
 
-            # Call GPT-4 text API (cheaper and faster than vision!)
-            response = client.chat.completions.create(
+            # Call GPT-4 text API (cheaper and faster than vision!), retried on transient errors
+            response = await create_chat_completion(
+                client,
                 model="gpt-4o",  # Latest GPT-4
                 messages=[
                     {
@@ -102,41 +140,73 @@ class GPTHTMLFraudDetector:
             logger.debug(f"GPT-4 response: {result_text[:200]}...")
 
             # Parse JSON
-            analysis = json.loads(result_text)
+            analysis = orjson.loads(result_text)
 
             # Normalize output
             normalized = self._normalize_analysis(analysis)
 
             logger.info(f"GPT-4 HTML analysis: score={normalized['fraud_score']:.3f}, risk={normalized['risk_level']}")
 
+            self._store_result(cache_key, normalized)
+
             return normalized
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"GPT-4 returned invalid JSON: {result_text[:200]}")
             return self._fallback_analysis()
         except Exception as e:
             logger.error(f"GPT-4 HTML analysis error: {str(e)}")
-            import traceback
-            logger.debug(traceback.format_exc())
+            logger.debug("GPT-4 HTML analysis traceback", exc_info=True)
             return self._fallback_analysis()
 
-    def _clean_html(self, html: str) -> str:
-        """Clean and truncate HTML for analysis"""
-        # Remove script tags
-        html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
+    async def analyze_posts_html(self, htmls: List[str]) -> List[Dict]:
+        """
+        Analyze several posts concurrently (one GPT round-trip for the batch)
 
-        # Remove style tags
-        html = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL | re.IGNORECASE)
+        Returns results in input order, same format as analyze_post_html().
+        """
+        return await asyncio.gather(*(self.analyze_post_html(html) for html in htmls))
 
-        # Remove comments
-        html = re.sub(r'<!--.*?-->', '', html, flags=re.DOTALL)
+    def _clean_html(self, html: str) -> str:
+        """Reduce post HTML to whitespace-collapsed visible text and truncate"""
+        original_length = len(html)
+
+        if '<' not in html:
+            # Already plain text (e.g. pre-extracted by the scraper), nothing to parse
+            pass
+        elif LexborHTMLParser is not None:
+            # Single Lexbor parse: drop non-visible elements (comments are
+            # never part of text()) and keep only visible post text
+            tree = LexborHTMLParser(html)
+            for node in tree.css(_STRIP_SELECTOR):
+                node.decompose()
+            html = tree.body.text(separator=' ', strip=True) if tree.body else ''
+        else:
+            # Remove script tags
+            html = _SCRIPT_RE.sub('', html)
+
+            # Remove style tags
+            html = _STYLE_RE.sub('', html)
+
+            # Remove comments
+            html = _COMMENT_RE.sub('', html)
+
+            # Drop remaining tags along with their attributes
+            html = unescape(_TAG_RE.sub(' ', html))
+
+        html = _WHITESPACE_RE.sub(' ', html).strip()
 
         # Truncate if too long (GPT-4 has token limits)
         max_length = 15000  # ~3750 tokens
         if len(html) > max_length:
             html = html[:max_length] + "\n... [truncated]"
 
-        return html.strip()
+        logger.debug(
+            f"Cleaned post HTML: {original_length:,} -> {len(html):,} chars "
+            f"(~{original_length // 4:,} -> ~{len(html) // 4:,} tokens)"
+        )
+
+        return html
 
     def _build_fraud_prompt(self, html: str) -> str:
         """Build fraud detection prompt"""
@@ -182,6 +252,20 @@ Return ONLY valid JSON:
 
 Be precise and factual."""
 
+    def _store_result(self, cache_key: bytes, result: Dict):
+        """Cache a copy of a GPT result, evicting the least recently used entry"""
+        if self.cache_size <= 0:
+            return
+
+        self._result_cache[cache_key] = self._copy_result(result)
+        self._result_cache.move_to_end(cache_key)
+        if len(self._result_cache) > self.cache_size:
+            self._result_cache.popitem(last=False)
+
+    def _copy_result(self, result: Dict) -> Dict:
+        """Copy a result so callers can't mutate cached lists"""
+        return {key: list(value) if isinstance(value, list) else value for key, value in result.items()}
+
     def _normalize_analysis(self, analysis: Dict) -> Dict:
         """Normalize GPT-4 output"""
         normalized = {
@@ -277,6 +361,5 @@ async def test_gpt_html():
 
 
 if __name__ == "__main__":
-    import asyncio
     logging.basicConfig(level=logging.INFO)
     asyncio.run(test_gpt_html())
@@ -3,14 +3,85 @@ GPT-4 Vision Fraud Detector
 Uses OpenAI GPT-4 Vision to analyze Facebook post screenshots
 MUCH faster than local Llama model (2-5s vs 60-120s)
 """
+import asyncio
 import base64
+import hashlib
+import io
 import logging
-from typing import Dict
-import json
+import mimetypes
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+import orjson
 import os
 
+from PIL import Image
+
+from app.ai.openai_client import HAS_OPENAI, create_chat_completion, get_openai_client, warmup_openai_client
+
 logger = logging.getLogger(__name__)
 
+# Longest side sent to GPT-4 Vision; high-detail mode bills per 512px tile,
+# and full-page screenshots don't need original resolution to be read
+_MAX_IMAGE_DIMENSION = 1568
+_JPEG_QUALITY = 85
+
+
+def _shrink_to_jpeg(image_bytes: bytes) -> Optional[bytes]:
+    """
+    Re-encode a screenshot as a JPEG no larger than _MAX_IMAGE_DIMENSION.
+    Returns None if the bytes can't be decoded (caller sends the original).
+    """
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            image.thumbnail((_MAX_IMAGE_DIMENSION, _MAX_IMAGE_DIMENSION), Image.LANCZOS)
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            buffer = io.BytesIO()
+            image.save(buffer, format='JPEG', quality=_JPEG_QUALITY)
+            return buffer.getvalue()
+    except (OSError, ValueError) as e:
+        logger.debug(f"Could not re-encode screenshot, sending original: {e}")
+        return None
+
+
+def _read_image(image_path: str) -> Tuple[bytes, bytes]:
+    """
+    Read an image file, return (content hash, original bytes).
+    The hash is of the original file so the cache key doesn't depend on
+    the encoder.
+    """
+    with open(image_path, 'rb') as img_file:
+        image_bytes = img_file.read()
+    return hashlib.blake2b(image_bytes, digest_size=16).digest(), image_bytes
+
+
+def _image_data_url(image_path: str, image_bytes: bytes) -> str:
+    """
+    Build the base64 data URL to send for a local screenshot.
+    The image is downscaled and sent as JPEG (5-10x smaller than PNG for
+    screenshots with photos).
+    """
+    jpeg_bytes = _shrink_to_jpeg(image_bytes)
+    if jpeg_bytes is not None:
+        return f"data:image/jpeg;base64,{base64.b64encode(jpeg_bytes).decode('utf-8')}"
+    mime_type = mimetypes.guess_type(image_path)[0] or 'image/png'
+    return f"data:{mime_type};base64,{base64.b64encode(image_bytes).decode('utf-8')}"
+
+
+async def _image_key_for(image_path: str) -> Tuple[bytes, Optional[bytes]]:
+    """
+    Return (cache key, local file bytes) for a screenshot.
+    Remote (http/https, e.g. presigned object-store) URLs are passed through
+    so OpenAI fetches them directly: no local read and no ~33% base64
+    inflation of the request body; they are keyed by URL and have no bytes.
+    Local files are keyed by content hash.
+    """
+    if image_path.startswith(('http://', 'https://')):
+        return hashlib.blake2b(image_path.encode('utf-8'), digest_size=16).digest(), None
+
+    # (disk read + hash run in a worker thread, off the event loop)
+    return await asyncio.to_thread(_read_image, image_path)
+
 
 class GPTVisionFraudDetector:
     """
@@ -18,25 +89,76 @@ class GPTVisionFraudDetector:
     Fast, accurate, cloud-based analysis
     """
 
-    def __init__(self, api_key: str = None):
+    # Static prompt, built once at class definition rather than per request
+    _FRAUD_PROMPT = """Analyze this Facebook post screenshot for fraud indicators.
+
+You are analyzing posts for Goa Police cyber patrol. Check for:
+
+FRAUD INDICATORS:
+- Scam keywords: advance payment, send money, UPI, Paytm, PhonePe, cheap hotel, free trip, guaranteed returns, limited offer, urgent, act now
+- Hindi/Marathi fraud keywords: पैसे भेजो, बुकिंग, सस्ता, मुफ्त, तुरंत
+- Phone numbers displayed prominently
+- Excessive discounts (50%+ off)
+- Fake payment screenshots
+- Pressure tactics (urgent, limited time, act now)
+- Too-good-to-be-true offers
+- Multiple payment methods mentioned
+
+EXTRACT:
+- Author/username
+- Post text content
+- Language (English/Hindi/Marathi/Mixed)
+
+SCORING:
+- 0.0-0.3: Legitimate
+- 0.4-0.6: Suspicious
+- 0.7-1.0: Fraud
+
+Return ONLY valid JSON:
+{
+    "is_fraud": true/false,
+    "fraud_score": 0.85,
+    "risk_level": "HIGH"/"MEDIUM"/"LOW",
+    "fraud_type": "hotel_booking_scam"/"investment_scam"/"advance_payment_fraud"/"gambling_scam"/"legitimate",
+    "reasoning": "brief explanation",
+    "username": "extracted author name",
+    "content": "extracted post text",
+    "language": "eng"/"hin"/"mar"/"mixed",
+    "red_flags": ["specific issues found"],
+    "matched_keywords": ["fraud keywords found"]
+}
+
+Be precise and factual."""
+    _PROMPT_PART = {"type": "text", "text": _FRAUD_PROMPT}
+
+    def __init__(self, api_key: str = None, cache_size: int = 2048):
         """
         Initialize GPT-4 Vision detector
 
         Args:
             api_key: OpenAI API key (or set OPENAI_API_KEY env var)
+            cache_size: Number of analyses kept, keyed by screenshot content hash
         """
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.cache_size = cache_size
+        self._result_cache: "OrderedDict[bytes, Dict]" = OrderedDict()
 
         if not self.api_key:
             logger.warning("No OpenAI API key provided. Set OPENAI_API_KEY environment variable.")
             logger.warning("Get your API key from: https://platform.openai.com/api-keys")
 
+    async def warmup(self) -> bool:
+        """Pre-open the pooled API connection so the first analysis skips the handshake"""
+        if not self.api_key:
+            return False
+        return await warmup_openai_client(self.api_key)
+
     async def analyze_screenshot(self, image_path: str) -> Dict:
         """
         Analyze a Facebook post screenshot using GPT-4 Vision
 
         Args:
-            image_path: Path to screenshot image
+            image_path: Path to screenshot image, or an http(s) URL to it
 
         Returns:
             {
@@ -56,41 +178,45 @@ class GPTVisionFraudDetector:
             logger.error("OpenAI API key not configured")
             return self._fallback_analysis()
 
-        try:
-            # Import OpenAI library
-            try:
-                from openai import OpenAI
-            except ImportError:
-                logger.error("OpenAI library not installed. Run: pip install openai")
-                return self._fallback_analysis()
-
-            # Initialize OpenAI client
-            client = OpenAI(api_key=self.api_key)
-
-            # Read and encode image
-            with open(image_path, 'rb') as img_file:
-                image_data = base64.b64encode(img_file.read()).decode('utf-8')
+        if not HAS_OPENAI:
+            logger.error("OpenAI library not installed. Run: pip install openai")
+            return self._fallback_analysis()
 
-            # Build prompt
-            prompt = self._build_fraud_prompt()
+        try:
+            # Shared async OpenAI client (reuses pooled connections)
+            client = get_openai_client(self.api_key)
+
+            cache_key, image_bytes = await _image_key_for(image_path)
+
+            # Retries, re-queues and repeat reports resend the same screenshot
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+                logger.info("GPT-4 Vision analysis cache hit")
+                return self._copy_result(cached)
+
+            # Image reference: remote URL as-is, local file as base64 data URL
+            # (resize + encode only on a miss, in a worker thread)
+            if image_bytes is None:
+                image_url = image_path
+            else:
+                image_url = await asyncio.to_thread(_image_data_url, image_path, image_bytes)
 
             logger.info("Sending image to GPT-4 Vision...")
 
-            # Call GPT-4 Vision API
-            response = client.chat.completions.create(
+            # Call GPT-4 Vision API (transient errors are retried with backoff)
+            response = await create_chat_completion(
+                client,
                 model="gpt-4o",  # Latest GPT-4 with vision
                 messages=[
                     {
                         "role": "user",
                         "content": [
-                            {
-                                "type": "text",
-                                "text": prompt
-                            },
+                            self._PROMPT_PART,
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": f"data:image/png;base64,{image_data}",
+                                    "url": image_url,
                                     "detail": "high"  # High detail for better fraud detection
                                 }
                             }
@@ -107,16 +233,18 @@ class GPTVisionFraudDetector:
             logger.debug(f"GPT-4 Vision response: {result_text[:200]}...")
 
             # Parse JSON
-            analysis = json.loads(result_text)
+            analysis = orjson.loads(result_text)
 
             # Normalize output
             normalized = self._normalize_analysis(analysis)
 
             logger.info(f"GPT-4 Vision analysis: score={normalized['fraud_score']:.3f}, risk={normalized['risk_level']}")
 
+            self._store_result(cache_key, normalized)
+
             return normalized
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"GPT-4 returned invalid JSON: {result_text[:200]}")
             return self._fallback_analysis()
         except FileNotFoundError:
@@ -124,51 +252,22 @@ class GPTVisionFraudDetector:
             return self._fallback_analysis()
         except Exception as e:
             logger.error(f"GPT-4 Vision analysis error: {str(e)}")
-            import traceback
-            logger.debug(traceback.format_exc())
+            logger.debug("GPT-4 Vision analysis traceback", exc_info=True)
             return self._fallback_analysis()
 
-    def _build_fraud_prompt(self) -> str:
-        """Build fraud detection prompt for GPT-4 Vision"""
-        return """Analyze this Facebook post screenshot for fraud indicators.
-
-You are analyzing posts for Goa Police cyber patrol. Check for:
-
-FRAUD INDICATORS:
-- Scam keywords: advance payment, send money, UPI, Paytm, PhonePe, cheap hotel, free trip, guaranteed returns, limited offer, urgent, act now
-- Hindi/Marathi fraud keywords: पैसे भेजो, बुकिंग, सस्ता, मुफ्त, तुरंत
-- Phone numbers displayed prominently
-- Excessive discounts (50%+ off)
-- Fake payment screenshots
-- Pressure tactics (urgent, limited time, act now)
-- Too-good-to-be-true offers
-- Multiple payment methods mentioned
+    def _store_result(self, cache_key: bytes, result: Dict):
+        """Cache a copy of an analysis, evicting the least recently used entry"""
+        if self.cache_size <= 0:
+            return
 
-EXTRACT:
-- Author/username
-- Post text content
-- Language (English/Hindi/Marathi/Mixed)
+        self._result_cache[cache_key] = self._copy_result(result)
+        self._result_cache.move_to_end(cache_key)
+        if len(self._result_cache) > self.cache_size:
+            self._result_cache.popitem(last=False)
 
-SCORING:
-- 0.0-0.3: Legitimate
-- 0.4-0.6: Suspicious
-- 0.7-1.0: Fraud
-
-Return ONLY valid JSON:
-{
-    "is_fraud": true/false,
-    "fraud_score": 0.85,
-    "risk_level": "HIGH"/"MEDIUM"/"LOW",
-    "fraud_type": "hotel_booking_scam"/"investment_scam"/"advance_payment_fraud"/"gambling_scam"/"legitimate",
-    "reasoning": "brief explanation",
-    "username": "extracted author name",
-    "content": "extracted post text",
-    "language": "eng"/"hin"/"mar"/"mixed",
-    "red_flags": ["specific issues found"],
-    "matched_keywords": ["fraud keywords found"]
-}
-
-Be precise and factual."""
+    def _copy_result(self, result: Dict) -> Dict:
+        """Copy a result so callers can't mutate cached lists"""
+        return {key: list(value) if isinstance(value, list) else value for key, value in result.items()}
 
     def _normalize_analysis(self, analysis: Dict) -> Dict:
         """Normalize GPT-4 Vision output"""
@@ -215,6 +314,121 @@ Be precise and factual."""
         }
 
 
+class GPTVisionBatchScheduler:
+    """
+    Micro-batching front end for GPTVisionFraudDetector
+    Screenshot requests are queued and dispatched in batches (up to
+    max_batch_size, or whatever arrived within max_wait seconds), with at most
+    max_concurrency GPT-4 Vision calls in flight. The workload is I/O-bound on
+    the OpenAI API, so N screenshots take ~N/max_concurrency round-trips
+    instead of N.
+    """
+
+    def __init__(
+        self,
+        detector: GPTVisionFraudDetector = None,
+        max_batch_size: int = 10,
+        max_wait: float = 0.05,
+        max_concurrency: int = 10
+    ):
+        self.detector = detector or GPTVisionFraudDetector()
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    async def submit(self, image_path: str) -> Dict:
+        """Queue a screenshot and wait for its analysis (same format as analyze_screenshot)"""
+        if self._worker_task is None or self._worker_task.done():
+            self._queue = asyncio.Queue()
+            self._worker_task = asyncio.create_task(self._worker())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image_path, future))
+        return await future
+
+    async def analyze_screenshots(self, image_paths: List[str]) -> List[Dict]:
+        """Analyze many screenshots concurrently, results in input order"""
+        return await asyncio.gather(*(self.submit(path) for path in image_paths))
+
+    async def close(self):
+        """
+        Stop the dispatcher, fail requests that were never dispatched and
+        wait for in-flight analyses to finish
+        """
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                self._fail_closed(future)
+
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    async def _worker(self):
+        """Collect queued requests into batches and dispatch them"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch: List[Tuple[str, asyncio.Future]] = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = loop.time() + self.max_wait
+
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Closed while collecting: these were taken off the queue,
+                # so close() won't see them
+                for _, future in batch:
+                    self._fail_closed(future)
+                raise
+
+            logger.debug(f"Dispatching GPT-4 Vision batch of {len(batch)} screenshots")
+
+            # Don't wait for the batch here: the semaphore bounds concurrency,
+            # so the next batch can start as soon as slots free up
+            for item in batch:
+                task = asyncio.create_task(self._run(item))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+    @staticmethod
+    def _fail_closed(future: asyncio.Future):
+        """Fail a request that will never be dispatched"""
+        if not future.done():
+            future.set_exception(RuntimeError("scheduler closed"))
+
+    async def _run(self, item: Tuple[str, asyncio.Future]):
+        """Analyze one screenshot under the concurrency limit"""
+        image_path, future = item
+        try:
+            async with self._semaphore:
+                result = await self.detector.analyze_screenshot(image_path)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+
+        if not future.done():
+            future.set_result(result)
+
+
 # Test function
 async def test_gpt_vision():
     """Test GPT-4 Vision fraud detector"""
@@ -0,0 +1,161 @@
+"""
+Hybrid Fraud Detector
+Triages Facebook post screenshots locally (OCR + keyword/pattern rules) and
+only escalates suspicious ones to GPT-4 Vision
+Most posts are obviously benign, so the paid 2-5s API call becomes the exception
+"""
+import logging
+from typing import Dict, Optional
+
+from app.ai.fraud_detector import FraudDetector
+from app.ai.gpt_vision_fraud_detector import GPTVisionFraudDetector
+from app.ai.image_analyzer import ImageAnalyzer
+
+logger = logging.getLogger(__name__)
+
+
+class HybridFraudDetector:
+    """
+    Two-stage screenshot fraud detection:
+    1. Local triage: OCR text scored by FraudDetector, plus payment-app and
+       QR code signals from ImageAnalyzer
+    2. GPT-4 Vision, only when the local score exceeds escalation_threshold
+       (or OCR found no text to judge)
+    """
+
+    # Added to the text score when the screenshot shows these
+    PAYMENT_LOGO_BONUS = 0.1
+    QR_CODE_BONUS = 0.1
+
+    def __init__(
+        self,
+        image_analyzer: ImageAnalyzer = None,
+        text_detector: FraudDetector = None,
+        gpt_detector: GPTVisionFraudDetector = None,
+        escalation_threshold: float = 0.4
+    ):
+        """
+        Args:
+            image_analyzer: Local OCR analyzer (created if not given)
+            text_detector: Keyword/pattern text scorer (created if not given)
+            gpt_detector: GPT-4 Vision detector for escalations (created if not given)
+            escalation_threshold: Local score above which GPT-4 Vision is called
+        """
+        self.image_analyzer = image_analyzer or ImageAnalyzer()
+        self.text_detector = text_detector or FraudDetector()
+        self.gpt_detector = gpt_detector or GPTVisionFraudDetector()
+        self.escalation_threshold = escalation_threshold
+
+    async def analyze_screenshot(self, image_path: str) -> Dict:
+        """
+        Analyze a Facebook post screenshot, escalating to GPT-4 Vision only if needed
+
+        Args:
+            image_path: Path to screenshot image, or an http(s) URL to it
+
+        Returns:
+            Same format as GPTVisionFraudDetector.analyze_screenshot, plus:
+            {
+                'local_score': float or None - triage score (None if skipped),
+                'analysis_source': str ('local' or 'gpt-4-vision')
+            }
+        """
+        # Remote screenshots can't be OCR'd locally; GPT-4 Vision fetches them
+        if image_path.startswith(('http://', 'https://')):
+            return await self._escalate(image_path, None)
+
+        image_result = await self.image_analyzer.analyze_screenshot(image_path)
+        text = image_result.get('text', '')
+
+        # Nothing to judge locally (image-only post or OCR failure)
+        if not text.strip():
+            logger.info("No OCR text, escalating to GPT-4 Vision")
+            return await self._escalate(image_path, None)
+
+        text_result = self.text_detector.analyze_text(text)
+        local_score = self._local_score(text_result, image_result)
+
+        if local_score > self.escalation_threshold:
+            logger.info(f"Local score {local_score:.3f} > {self.escalation_threshold}, escalating to GPT-4 Vision")
+            return await self._escalate(image_path, local_score)
+
+        logger.info(f"Local triage: score={local_score:.3f}, not escalated")
+        return self._local_result(text_result, image_result, local_score)
+
+    def _local_score(self, text_result: Dict, image_result: Dict) -> float:
+        """Combine the text score with visual payment signals"""
+        score = text_result['fraud_score']
+        if image_result.get('has_payment_logo'):
+            score += self.PAYMENT_LOGO_BONUS
+        if image_result.get('has_qr_code'):
+            score += self.QR_CODE_BONUS
+        return min(score, 1.0)
+
+    async def _escalate(self, image_path: str, local_score: Optional[float]) -> Dict:
+        """Run GPT-4 Vision and annotate the result with the triage score"""
+        result = await self.gpt_detector.analyze_screenshot(image_path)
+        result['local_score'] = local_score
+        result['analysis_source'] = 'gpt-4-vision'
+        return result
+
+    def _local_result(self, text_result: Dict, image_result: Dict, local_score: float) -> Dict:
+        """Shape a non-escalated local analysis like a GPT-4 Vision result"""
+        if local_score >= 0.7:
+            risk_level = 'HIGH'
+        elif local_score >= 0.4:
+            risk_level = 'MEDIUM'
+        else:
+            risk_level = 'LOW'
+
+        red_flags = list(text_result['matched_patterns'])
+        if image_result.get('has_payment_logo'):
+            red_flags.append('payment_app_mentioned')
+        if image_result.get('has_qr_code'):
+            red_flags.append('qr_code')
+
+        return {
+            'is_fraud': local_score >= 0.7,
+            'fraud_score': local_score,
+            'risk_level': risk_level,
+            'fraud_type': text_result['fraud_type'] if local_score >= 0.4 else 'legitimate',
+            'reasoning': text_result['reasoning'],
+            'username': image_result.get('username'),
+            'content': image_result.get('text', ''),
+            'language': image_result.get('language', 'unknown'),
+            'red_flags': red_flags,
+            'matched_keywords': list(text_result['matched_keywords']),
+            'local_score': local_score,
+            'analysis_source': 'local'
+        }
+
+
+# Test function
+async def test_hybrid_detector():
+    """Test the hybrid detector on a screenshot"""
+    import sys
+    import time
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m app.ai.hybrid_fraud_detector <screenshot>")
+        return
+
+    detector = HybridFraudDetector()
+
+    start = time.time()
+    result = await detector.analyze_screenshot(sys.argv[1])
+    elapsed = time.time() - start
+
+    print("\n" + "="*60)
+    print(f"Source: {result['analysis_source']} ({elapsed:.1f}s)")
+    print(f"Local Score: {result['local_score']}")
+    print(f"Fraud Score: {result['fraud_score']:.3f}")
+    print(f"Risk Level: {result['risk_level']}")
+    print(f"Fraud Type: {result['fraud_type']}")
+    print(f"Reasoning: {result['reasoning']}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    import asyncio
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(test_hybrid_detector())
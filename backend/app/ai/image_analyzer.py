@@ -5,13 +5,18 @@ Supports English, Hindi, and Marathi languages
 """
 import cv2
 import pytesseract
-from PIL import Image
 import numpy as np
 import logging
+import threading
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import re
 
+try:
+    import tesserocr  # In-process Tesseract API: models stay loaded between calls
+except ImportError:
+    tesserocr = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,15 +29,97 @@ class ImageAnalyzer:
     - QR code detection
     """
 
+    # Payment app keywords for logo detection
+    PAYMENT_KEYWORDS = (
+        'paytm', 'phonepe', 'gpay', 'googlepay', 'bhim', 'upi',
+        'whatsapp pay', 'amazon pay', 'mobikwik', 'freecharge'
+    )
+
+    # Compiled once per process, not per screenshot
+    _DEVANAGARI_RE = re.compile(r'[\u0900-\u097F]')
+    _LATIN_RE = re.compile(r'[a-zA-Z]')
+    # Substring semantics (no \b): OCR often glues app names to nearby text
+    _PAYMENT_RE = re.compile('|'.join(re.escape(k) for k in PAYMENT_KEYWORDS), re.IGNORECASE)
+    _USERNAME_SUFFIX_RE = re.compile(r'\s+(·|•|@|Sponsored|Follow).*')
+
+    # Mean Canny edge value (0-255) below which an image can't contain a QR
+    # code; kept low so small codes on an otherwise plain post still pass
+    _QR_MIN_EDGE_MEAN = 0.25
+
+    # Full-page Facebook screenshots are often 1440x3000+; OCR time scales
+    # with pixel count and text stays legible well below that
+    _MAX_DIMENSION = 1568
+
     def __init__(self):
         """Initialize image analyzer"""
         self.supported_languages = ['eng', 'hin', 'mar']  # English, Hindi, Marathi
 
-        # Payment app keywords for logo detection
-        self.payment_keywords = [
-            'paytm', 'phonepe', 'gpay', 'googlepay', 'bhim', 'upi',
-            'whatsapp pay', 'amazon pay', 'mobikwik', 'freecharge'
-        ]
+        self.payment_keywords = list(self.PAYMENT_KEYWORDS)
+
+        # Persistent tesserocr API per language string, created on first use.
+        # pytesseract fork/execs tesseract and reloads eng+hin+mar models on
+        # every call; the API is not thread-safe, hence the lock.
+        self._tess_apis: Dict[str, object] = {}
+        self._tess_lock = threading.Lock()
+
+        # Reused across screenshots instead of re-allocated per call
+        self._qr_detector = cv2.QRCodeDetector()
+
+    def _get_tess_api(self, lang: str):
+        """Return a loaded tesserocr API for lang, or None to use pytesseract"""
+        if tesserocr is None:
+            return None
+
+        if lang not in self._tess_apis:
+            try:
+                self._tess_apis[lang] = tesserocr.PyTessBaseAPI(lang=lang)
+            except RuntimeError as e:
+                logger.warning(f"tesserocr could not load '{lang}', using pytesseract: {e}")
+                self._tess_apis[lang] = None
+        return self._tess_apis[lang]
+
+    def _ocr_data(self, gray: np.ndarray, lang: str) -> Dict[str, list]:
+        """
+        OCR a grayscale image once, returning word data shaped like pytesseract's
+        image_to_data DICT output (block_num, par_num, line_num, top, conf, text)
+        """
+        with self._tess_lock:
+            api = self._get_tess_api(lang)
+            if api is not None:
+                height, width = gray.shape[:2]
+                api.SetImageBytes(np.ascontiguousarray(gray).tobytes(), width, height, 1, width)
+                return self._parse_tsv_words(api.GetTSVText(0))
+
+        return pytesseract.image_to_data(
+            gray,
+            lang=lang,
+            output_type=pytesseract.Output.DICT
+        )
+
+    def _parse_tsv_words(self, tsv: str) -> Dict[str, list]:
+        """Parse Tesseract TSV (level, page, block, par, line, word, box, conf, text) word rows"""
+        words: Dict[str, list] = {
+            'block_num': [], 'par_num': [], 'line_num': [], 'top': [], 'conf': [], 'text': []
+        }
+        for row in tsv.splitlines():
+            cols = row.split('\t')
+            if len(cols) < 12 or cols[0] != '5':  # level 5 = word
+                continue
+            words['block_num'].append(int(cols[2]))
+            words['par_num'].append(int(cols[3]))
+            words['line_num'].append(int(cols[4]))
+            words['top'].append(int(cols[7]))
+            words['conf'].append(float(cols[10]))
+            words['text'].append(cols[11])
+        return words
+
+    def _group_lines(self, ocr_data: Dict[str, list], indices: List[int]) -> List[str]:
+        """Join the given words into text lines by (block, paragraph, line)"""
+        lines: Dict[Tuple[int, int, int], List[str]] = {}
+        for i in indices:
+            key = (ocr_data['block_num'][i], ocr_data['par_num'][i], ocr_data['line_num'][i])
+            lines.setdefault(key, []).append(ocr_data['text'][i].strip())
+        return [' '.join(words) for words in lines.values()]
 
     async def analyze_screenshot(
         self,
@@ -60,23 +147,22 @@ class ImageAnalyzer:
             }
         """
         try:
-            # Load image
-            image = cv2.imread(image_path)
-            if image is None:
+            # Load image straight to grayscale: OCR binarizes and QR detection
+            # works on gray anyway, so no BGR/RGB/PIL copies are needed
+            gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+            if gray is None:
                 logger.error(f"Failed to load image: {image_path}")
                 return self._empty_result()
 
-            # Convert to RGB (OpenCV uses BGR)
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(image_rgb)
+            gray = self._downscale(gray)
 
             # Extract text with multi-language OCR
-            ocr_result = await self._extract_text_multilang(pil_image)
+            ocr_result = await self._extract_text_multilang(gray)
 
-            # Extract username from top portion
+            # Extract username from top portion (reuses the OCR word boxes)
             username = None
-            if extract_username:
-                username = await self._extract_username(image_rgb)
+            if extract_username and ocr_result.get('ocr_data'):
+                username = self._extract_username(ocr_result['ocr_data'], gray.shape[0])
 
             # Detect fraud indicators
             has_payment_logo = False
@@ -84,7 +170,7 @@ class ImageAnalyzer:
 
             if detect_fraud_indicators:
                 has_payment_logo = self._detect_payment_logos(ocr_result['text'])
-                has_qr_code = self._detect_qr_code(image)
+                has_qr_code = self._detect_qr_code(gray)
 
             result = {
                 'text': ocr_result['text'],
@@ -105,7 +191,17 @@ class ImageAnalyzer:
             logger.debug(traceback.format_exc())
             return self._empty_result()
 
-    async def _extract_text_multilang(self, pil_image: Image) -> Dict:
+    def _downscale(self, gray: np.ndarray) -> np.ndarray:
+        """Shrink an image so its longest side is at most _MAX_DIMENSION"""
+        height, width = gray.shape[:2]
+        scale = min(1.0, self._MAX_DIMENSION / max(height, width))
+        if scale >= 1.0:
+            return gray
+
+        logger.debug(f"Downscaling {width}x{height} screenshot by {scale:.2f} for OCR")
+        return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    async def _extract_text_multilang(self, gray: np.ndarray) -> Dict:
         """
         Extract text using multi-language OCR
         Auto-detects and uses appropriate language model
@@ -114,32 +210,27 @@ class ImageAnalyzer:
             # First pass: Try all languages together
             lang_string = '+'.join(self.supported_languages)  # 'eng+hin+mar'
 
-            # Get detailed OCR data
-            ocr_data = pytesseract.image_to_data(
-                pil_image,
-                lang=lang_string,
-                output_type=pytesseract.Output.DICT
-            )
+            # Get detailed OCR data (single pass: words, boxes, line ids)
+            ocr_data = self._ocr_data(gray, lang_string)
 
-            # Extract text with confidence filtering
-            texts = []
-            confidences = []
+            # Extract text with confidence filtering (vectorized over all words;
+            # conf may be str/float/int depending on the OCR backend)
+            confs = np.asarray(ocr_data['conf'], dtype=np.float64).astype(np.int32)
+            words = np.char.strip(np.asarray(ocr_data['text'], dtype=str))
+            mask = (confs > 30) & (words != '')  # Filter low confidence
 
-            for i, text in enumerate(ocr_data['text']):
-                conf = int(ocr_data['conf'][i])
-                if conf > 30 and text.strip():  # Filter low confidence
-                    texts.append(text.strip())
-                    confidences.append(conf)
+            texts = words[mask].tolist()
+            kept_confs = confs[mask]
+            kept = np.flatnonzero(mask).tolist()
 
             full_text = ' '.join(texts)
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+            avg_confidence = float(kept_confs.mean()) if kept_confs.size else 0
 
             # Detect language
             detected_lang = self._detect_language(full_text)
 
-            # Get line-by-line text
-            lines = pytesseract.image_to_string(pil_image, lang=lang_string).split('\n')
-            lines = [line.strip() for line in lines if line.strip()]
+            # Get line-by-line text from the same OCR data
+            lines = self._group_lines(ocr_data, kept)
 
             logger.debug(f"OCR extracted {len(texts)} words, avg confidence: {avg_confidence:.1f}%")
 
@@ -147,7 +238,8 @@ class ImageAnalyzer:
                 'text': full_text,
                 'lines': lines,
                 'confidence': avg_confidence,
-                'language': detected_lang
+                'language': detected_lang,
+                'ocr_data': ocr_data
             }
 
         except Exception as e:
@@ -159,30 +251,27 @@ class ImageAnalyzer:
                 'language': 'unknown'
             }
 
-    async def _extract_username(self, image_rgb: np.ndarray) -> Optional[str]:
+    def _extract_username(self, ocr_data: Dict[str, list], image_height: int) -> Optional[str]:
         """
         Extract username from top portion of screenshot
         Facebook posts typically have username at the top
         """
         try:
-            # Crop top 15% of image (where username usually is)
-            height, width = image_rgb.shape[:2]
-            top_portion = image_rgb[0:int(height * 0.15), :]
-
-            # Convert to PIL image
-            pil_top = Image.fromarray(top_portion)
-
-            # Extract text from top portion
-            text = pytesseract.image_to_string(pil_top, lang='eng+hin+mar')
+            # Words starting in the top 15% of the image (where username usually is)
+            top_limit = image_height * 0.15
+            top_words = [
+                i for i, text in enumerate(ocr_data['text'])
+                if text.strip() and ocr_data['top'][i] < top_limit
+            ]
 
             # Username is usually first non-empty line
-            lines = [line.strip() for line in text.split('\n') if line.strip()]
+            lines = self._group_lines(ocr_data, top_words)
 
             if lines:
                 # Clean up username (remove extra characters)
                 username = lines[0]
                 # Remove common UI elements
-                username = re.sub(r'\s+(·|•|@|Sponsored|Follow).*', '', username)
+                username = self._USERNAME_SUFFIX_RE.sub('', username)
                 username = username.strip()
 
                 if len(username) > 2 and len(username) < 100:  # Reasonable username length
@@ -204,12 +293,10 @@ class ImageAnalyzer:
             return 'unknown'
 
         # Check for Devanagari script (Hindi/Marathi)
-        devanagari_pattern = re.compile(r'[\u0900-\u097F]')
-        has_devanagari = bool(devanagari_pattern.search(text))
+        has_devanagari = bool(self._DEVANAGARI_RE.search(text))
 
         # Check for Latin script (English)
-        latin_pattern = re.compile(r'[a-zA-Z]')
-        has_latin = bool(latin_pattern.search(text))
+        has_latin = bool(self._LATIN_RE.search(text))
 
         if has_devanagari and has_latin:
             return 'mixed'
@@ -227,24 +314,22 @@ class ImageAnalyzer:
         Detect payment app names in text
         (Could be enhanced with actual logo detection using CV)
         """
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in self.payment_keywords)
+        return bool(self._PAYMENT_RE.search(text))
 
-    def _detect_qr_code(self, image: np.ndarray) -> bool:
+    def _detect_qr_code(self, gray: np.ndarray) -> bool:
         """
-        Detect QR codes in image using OpenCV
+        Detect QR codes in a grayscale image using OpenCV
         """
         try:
-            # Convert to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
-            # Initialize QR code detector
-            qr_detector = cv2.QRCodeDetector()
+            # Cheap prefilter: flat images (plain text posts) have too few
+            # edges for QR finder patterns
+            if cv2.Canny(gray, 100, 200).mean() < self._QR_MIN_EDGE_MEAN:
+                return False
 
-            # Detect and decode
-            data, bbox, straight_qr = qr_detector.detectAndDecode(gray)
+            # Detect only - we need presence, not the decoded payload
+            found, _ = self._qr_detector.detect(gray)
 
-            return bbox is not None
+            return bool(found)
 
         except Exception as e:
             logger.debug(f"QR detection failed: {str(e)}")
@@ -0,0 +1,136 @@
+"""
+Shared OpenAI client
+One AsyncOpenAI client per API key, backed by a pooled httpx.AsyncClient,
+so GPT detectors reuse keep-alive connections instead of paying a TCP+TLS
+handshake to api.openai.com on every request, plus the retry policy for
+transient API errors
+"""
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+try:
+    from openai import APIConnectionError, AsyncOpenAI, InternalServerError, RateLimitError
+    # Rate limits, timeouts / dropped connections (APITimeoutError is an
+    # APIConnectionError) and 5xx are worth retrying; 4xx are permanent
+    _RETRYABLE_ERRORS: Tuple[type, ...] = (RateLimitError, APIConnectionError, InternalServerError)
+except ImportError:
+    AsyncOpenAI = None
+    _RETRYABLE_ERRORS = ()
+
+# Resolved once at import; callers check this instead of importing per call
+HAS_OPENAI = AsyncOpenAI is not None
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+logger = logging.getLogger(__name__)
+
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+# Exponential backoff for create_chat_completion: 1s, 2s, 4s ... capped at 10s
+_MAX_ATTEMPTS = 3
+_RETRY_BASE_WAIT = 1.0
+_RETRY_MAX_WAIT = 10.0
+
+# api_key -> (event loop the client was created on, client)
+_clients: Dict[str, Tuple[asyncio.AbstractEventLoop, "AsyncOpenAI"]] = {}
+
+
+def get_openai_client(api_key: str) -> Optional["AsyncOpenAI"]:
+    """
+    Return the shared AsyncOpenAI client for this API key, creating it lazily.
+    Must be called from a running event loop; httpx connections are bound to
+    the loop they were opened on, so a new loop (e.g. a fresh asyncio.run in a
+    worker) gets a new client. Returns None when openai is not installed.
+    """
+    if not HAS_OPENAI:
+        return None
+
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(api_key)
+    if entry is not None and entry[0] is loop:
+        return entry[1]
+
+    if entry is not None:
+        _close_stale_client(*entry)
+
+    http_client = httpx.AsyncClient(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT, http2=_HTTP2)
+    # Retries are handled by create_chat_completion, not inside the SDK
+    client = AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+    _clients[api_key] = (loop, client)
+    logger.debug(f"Created shared OpenAI client (http2={_HTTP2})")
+    return client
+
+
+def _close_stale_client(loop: asyncio.AbstractEventLoop, client: "AsyncOpenAI") -> None:
+    """
+    Release a client being replaced because it belongs to another loop.
+    Its connections can only be closed on that loop: if it is still running
+    (another thread) the close is scheduled there; once it has stopped the
+    client is dropped and its sockets are closed when it is collected.
+    """
+    if loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.close(), loop)
+    else:
+        logger.debug("Dropping OpenAI client of a stopped event loop")
+
+
+async def create_chat_completion(client: "AsyncOpenAI", max_attempts: int = _MAX_ATTEMPTS, **kwargs: Any) -> Any:
+    """
+    client.chat.completions.create with bounded exponential-backoff retries on
+    rate limits, timeouts, connection drops and 5xx. Other errors, and the
+    last transient one once attempts are exhausted, propagate to the caller.
+    """
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return await client.chat.completions.create(**kwargs)
+        except _RETRYABLE_ERRORS as e:
+            if attempt == max_attempts:
+                logger.error(f"OpenAI request failed after {attempt} attempts: {type(e).__name__}")
+                raise
+            delay = min(_RETRY_MAX_WAIT, _RETRY_BASE_WAIT * 2 ** (attempt - 1))
+            logger.warning(
+                f"OpenAI {type(e).__name__}, retry {attempt}/{max_attempts - 1} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+
+async def warmup_openai_client(api_key: Optional[str] = None, timeout: float = 5.0) -> bool:
+    """
+    Open a keep-alive connection to the OpenAI API ahead of the first real
+    request (DNS + TCP + TLS otherwise land on the first analysis).
+    Uses the key from OPENAI_API_KEY when none is given. Never raises.
+    """
+    api_key = api_key or os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        return False
+
+    client = get_openai_client(api_key)
+    if client is None:
+        return False
+
+    try:
+        # Cheap authenticated call; with_options shares the pooled http client
+        await client.with_options(timeout=timeout).models.list()
+        logger.info("OpenAI connection warmed up")
+        return True
+    except Exception as e:
+        logger.warning(f"OpenAI warmup failed: {type(e).__name__}: {e}")
+        return False
+
+
+async def close_openai_clients():
+    """Close pooled OpenAI connections (call on application shutdown)"""
+    loop = asyncio.get_running_loop()
+    for api_key, (client_loop, client) in list(_clients.items()):
+        if client_loop is loop:
+            await client.close()
+        _clients.pop(api_key, None)
@@ -3,30 +3,138 @@ Vision-based Fraud Detector
 Uses Llama 3.2 Vision to analyze Facebook post screenshots for fraud
 Replaces OCR + keyword approach with AI vision analysis
 """
+import asyncio
 import base64
-import requests
+import aiohttp
+import hashlib
 import logging
-from typing import Dict, Optional
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
 from pathlib import Path
-import json
+import orjson
 
 logger = logging.getLogger(__name__)
 
 
+def _read_image_b64(image_path: str) -> Tuple[bytes, str]:
+    """Read an image file, return (content hash, base64-encoded bytes)"""
+    with open(image_path, 'rb') as img_file:
+        image_bytes = img_file.read()
+    digest = hashlib.blake2b(image_bytes, digest_size=16).digest()
+    return digest, base64.b64encode(image_bytes).decode('utf-8')
+
+
 class VisionFraudDetector:
     """
     AI Vision-based fraud detection for Facebook screenshots
     Uses Llama 3.2 Vision model via Ollama
     """
 
-    def __init__(self, model: str = "llama3.2-vision", base_url: str = "http://localhost:11434"):
+    # Simplified prompt for faster inference, built once at class definition
+    _FRAUD_PROMPT = """Analyze this Facebook post for fraud. Look for:
+- Scam keywords: advance payment, UPI, cheap hotel, guaranteed returns, urgent, limited offer
+- Phone numbers in post
+- Excessive discounts (50%+ off)
+- Pressure tactics
+
+Extract username and post text.
+
+Return JSON:
+{
+    "is_fraud": true/false,
+    "fraud_score": 0.0-1.0,
+    "risk_level": "HIGH"/"MEDIUM"/"LOW",
+    "fraud_type": "hotel_scam"/"investment_scam"/"payment_fraud"/"legitimate",
+    "reasoning": "brief explanation",
+    "username": "author name",
+    "content": "post text",
+    "language": "eng"/"hin"/"mar"/"mixed",
+    "red_flags": ["issues found"],
+    "matched_keywords": ["fraud keywords"]
+}"""
+
+    def __init__(
+        self,
+        model: str = "llama3.2-vision",
+        base_url: str = "http://localhost:11434",
+        cache_size: int = 2048,
+        num_parallel: int = 2
+    ):
+        """
+        Args:
+            model: Ollama vision model name
+            base_url: Ollama server URL
+            cache_size: Number of analyses kept, keyed by screenshot content hash
+            num_parallel: Generations kept in flight against the model; match
+                the server's OLLAMA_NUM_PARALLEL (extra requests just queue there)
+        """
         self.model = model
         self.base_url = base_url
+        # Analyses keyed by screenshot content hash (re-scans skip the model)
+        self.cache_size = cache_size
+        self._result_cache: "OrderedDict[bytes, Dict]" = OrderedDict()
+        # Created lazily: aiohttp sessions must be opened inside a running loop
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Dedicated worker feeding this model, started on first use
+        self.num_parallel = max(1, num_parallel)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the keep-alive session to Ollama, (re)creating it for this loop"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session_loop = loop
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=16, keepalive_timeout=300),
+                timeout=aiohttp.ClientTimeout(total=180)  # 3 minutes for vision model
+            )
+        return self._session
+
+    async def aclose(self):
+        """Stop the worker, fail queued requests, and close the Ollama session"""
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_result(self._fallback_analysis())
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def warmup(self) -> bool:
+        """Open a keep-alive connection to Ollama before the first analysis. Never raises."""
+        try:
+            async with self._get_session().get(
+                f"{self.base_url}/api/tags",
+                timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                await response.read()
+                return response.status == 200
+        except Exception as e:
+            logger.warning(f"Ollama warmup failed: {type(e).__name__}: {e}")
+            return False
 
     async def analyze_screenshot(self, image_path: str) -> Dict:
         """
         Analyze a Facebook post screenshot for fraud using AI vision
 
+        Requests are queued to a per-model worker that keeps Ollama busy
+        back-to-back, so concurrent scans don't contend for the model
+
         Args:
             image_path: Path to screenshot image
 
@@ -44,54 +152,114 @@ class VisionFraudDetector:
                 'matched_keywords': [str]
             }
         """
-        try:
-            # Read image and convert to base64
-            with open(image_path, 'rb') as img_file:
-                image_data = base64.b64encode(img_file.read()).decode('utf-8')
+        if self._worker_task is None or self._worker_task.done():
+            self._queue = asyncio.Queue()
+            self._worker_task = asyncio.create_task(self._worker())
 
-            # Fraud detection prompt
-            prompt = self._build_fraud_prompt()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image_path, future))
+        return await future
+
+    async def _worker(self):
+        """
+        Dispatch queued screenshots to Ollama
+        The next image is read and encoded while up to num_parallel
+        generations are running, so encoding request N overlaps generation
+        of request N-1 instead of the model idling between calls
+        """
+        slots = asyncio.Semaphore(self.num_parallel)
+
+        while True:
+            image_path, future = await self._queue.get()
+            if future.done():  # caller gave up
+                continue
+
+            try:
+                # Read image and convert to base64
+                # (disk read + hash + encode run in a worker thread, off the event loop)
+                cache_key, image_data = await asyncio.to_thread(_read_image_b64, image_path)
+            except FileNotFoundError:
+                logger.error(f"Screenshot not found: {image_path}")
+                self._resolve(future, self._fallback_analysis())
+                continue
+            except Exception as e:
+                logger.error(f"Vision analysis error: {str(e)}")
+                self._resolve(future, self._fallback_analysis())
+                continue
+
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+                logger.info("Vision analysis cache hit")
+                self._resolve(future, self._copy_result(cached))
+                continue
+
+            await slots.acquire()
+            task = asyncio.create_task(self._run(cache_key, image_data, future, slots))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run(self, cache_key: bytes, image_data: str, future: asyncio.Future, slots: asyncio.Semaphore):
+        """Run one generation in a model slot and hand the result to the caller"""
+        try:
+            result = await self._generate(cache_key, image_data)
+        finally:
+            slots.release()
+        self._resolve(future, result)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Dict):
+        """Set a request's result unless the caller has already gone away"""
+        if not future.done():
+            future.set_result(result)
+
+    async def _generate(self, cache_key: bytes, image_data: str) -> Dict:
+        """Call the Ollama vision model on an encoded screenshot"""
+        try:
+            payload = {
+                "model": self.model,
+                "prompt": self._FRAUD_PROMPT,
+                "images": [image_data],
+                "stream": False,
+                "format": "json",
+                "options": {
+                    "temperature": 0.1,  # Low temperature for consistent analysis
+                    "num_predict": 300,   # Reduced for faster response
+                }
+            }
 
-            # Call Ollama Vision API
-            response = requests.post(
+            # Call Ollama Vision API (orjson: the body carries the whole base64 image)
+            async with self._get_session().post(
                 f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "images": [image_data],
-                    "stream": False,
-                    "format": "json",
-                    "options": {
-                        "temperature": 0.1,  # Low temperature for consistent analysis
-                        "num_predict": 300,   # Reduced for faster response
-                    }
-                },
-                timeout=180  # Increased to 3 minutes for vision model
-            )
+                data=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"}
+            ) as response:
+                if response.status != 200:
+                    logger.error(f"Ollama Vision API error: {response.status}")
+                    return self._fallback_analysis()
 
-            if response.status_code != 200:
-                logger.error(f"Ollama Vision API error: {response.status_code}")
-                return self._fallback_analysis()
+                result = orjson.loads(await response.read())
 
-            result = response.json()
             llm_output = result.get("response", "")
 
             # Parse JSON response
             try:
-                analysis = json.loads(llm_output)
+                analysis = orjson.loads(llm_output)
 
                 # Validate and normalize output
-                return self._normalize_analysis(analysis)
+                normalized = self._normalize_analysis(analysis)
+                self._store_result(cache_key, normalized)
+                return normalized
 
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
                 logger.error(f"Vision model returned invalid JSON: {llm_output[:200]}")
                 return self._fallback_analysis()
 
-        except requests.exceptions.ConnectionError:
+        except aiohttp.ClientConnectionError:
             logger.error("Cannot connect to Ollama. Is it running? Run: ollama serve")
             return self._fallback_analysis()
-        except FileNotFoundError:
-            logger.error(f"Screenshot not found: {image_path}")
+        except asyncio.TimeoutError:
+            logger.error("Ollama Vision API timed out")
             return self._fallback_analysis()
         except Exception as e:
             logger.error(f"Vision analysis error: {str(e)}")
@@ -99,29 +267,19 @@ class VisionFraudDetector:
             logger.debug(traceback.format_exc())
             return self._fallback_analysis()
 
-    def _build_fraud_prompt(self) -> str:
-        """Build simplified fraud detection prompt for faster inference"""
-        return """Analyze this Facebook post for fraud. Look for:
-- Scam keywords: advance payment, UPI, cheap hotel, guaranteed returns, urgent, limited offer
-- Phone numbers in post
-- Excessive discounts (50%+ off)
-- Pressure tactics
+    def _store_result(self, cache_key: bytes, result: Dict):
+        """Cache a copy of an analysis, evicting the least recently used entry"""
+        if self.cache_size <= 0:
+            return
 
-Extract username and post text.
+        self._result_cache[cache_key] = self._copy_result(result)
+        self._result_cache.move_to_end(cache_key)
+        if len(self._result_cache) > self.cache_size:
+            self._result_cache.popitem(last=False)
 
-Return JSON:
-{
-    "is_fraud": true/false,
-    "fraud_score": 0.0-1.0,
-    "risk_level": "HIGH"/"MEDIUM"/"LOW",
-    "fraud_type": "hotel_scam"/"investment_scam"/"payment_fraud"/"legitimate",
-    "reasoning": "brief explanation",
-    "username": "author name",
-    "content": "post text",
-    "language": "eng"/"hin"/"mar"/"mixed",
-    "red_flags": ["issues found"],
-    "matched_keywords": ["fraud keywords"]
-}"""
+    def _copy_result(self, result: Dict) -> Dict:
+        """Copy a result so callers can't mutate cached lists"""
+        return {key: list(value) if isinstance(value, list) else value for key, value in result.items()}
 
     def _normalize_analysis(self, analysis: Dict) -> Dict:
         """Normalize and validate vision model output"""
@@ -171,12 +329,16 @@ Return JSON:
             'matched_keywords': []
         }
 
-    def check_model_available(self) -> bool:
+    async def check_model_available(self) -> bool:
         """Check if Llama 3.2 Vision is available"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            if response.status_code == 200:
-                models = response.json().get("models", [])
+            async with self._get_session().get(
+                f"{self.base_url}/api/tags",
+                timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                if response.status != 200:
+                    return False
+                models = orjson.loads(await response.read()).get("models", [])
                 model_names = [m.get("name") for m in models]
                 logger.info(f"Available Ollama models: {model_names}")
 
@@ -186,8 +348,7 @@ Return JSON:
                 else:
                     logger.warning(f"❌ Vision model {self.model} not found. Run: ollama pull {self.model}")
                     return False
-            return False
-        except requests.exceptions.ConnectionError:
+        except aiohttp.ClientConnectionError:
             logger.error("❌ Ollama is not running. Start it with: ollama serve")
             return False
         except Exception as e:
@@ -201,7 +362,7 @@ async def test_vision_detector():
     detector = VisionFraudDetector(model="llama3.2-vision")
 
     # Check if model is available
-    if not detector.check_model_available():
+    if not await detector.check_model_available():
         print("\n" + "="*80)
         print("SETUP INSTRUCTIONS:")
         print("="*80)
@@ -245,6 +406,8 @@ async def test_vision_detector():
     print(f"  {result['content'][:200]}...")
     print("="*80)
 
+    await detector.aclose()
+
 
 if __name__ == "__main__":
     import asyncio
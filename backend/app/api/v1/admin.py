@@ -3,28 +3,91 @@ Admin API endpoints - Officer and role management
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import func, desc, select, tuple_, update
 from typing import List, Optional
 from datetime import datetime, timedelta
 from loguru import logger
-
-from app.database import get_db
-from app.dependencies import get_current_officer, require_permission
+import asyncio
+import orjson
+
+from app.core.cache import cache_get, cache_set
+from app.database import get_async_db
+from app.dependencies import (
+    get_current_officer,
+    invalidate_officer_profile,
+    require_permission,
+)
 from app.models import Officer, Role, Permission, ActivityLog
-from app.schemas import ApiResponse, OfficerResponse
-from app.utils import hash_password
-
-
-router = APIRouter(prefix="/admin", tags=["Admin"])
+from app.services.activity_logger import log_activity
+from app.schemas import ApiResponse, OfficerResponse, api_envelope
+from app.utils import (
+    OfficerContext,
+    decode_cursor,
+    hash_password,
+    invalidate_officer_tokens,
+    next_cursor,
+)
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"], default_response_class=ORJSONResponse)
+
+# Redis keys for the serialized role/permission lists (bump the version when
+# the payload shape changes; delete them from any role-mutation endpoint)
+ROLES_CACHE_KEY = "admin:roles:v1"
+PERMISSIONS_CACHE_KEY = "admin:perms:v1"
+ROLES_CACHE_TTL = 300
+PERMISSIONS_CACHE_TTL = 3600
+
+# Response fields of get_activity_logs, selected as plain columns
+_ACTIVITY_LOG_COLUMNS = (
+    ActivityLog.id,
+    ActivityLog.officer_id,
+    ActivityLog.action,
+    ActivityLog.resource_type,
+    ActivityLog.resource_id,
+    ActivityLog.ip_address,
+    ActivityLog.user_agent,
+    ActivityLog.timestamp,
+    ActivityLog.details,
+)
+
+# OfficerResponse reads roles and their permissions; async sessions can't
+# lazy-load, so fetch them up front (one SELECT per relationship level)
+_OFFICER_RELATIONS = selectinload(Officer.roles).selectinload(Role.permissions)
+
+
+async def _load_officer(db: AsyncSession, officer_id: str) -> Optional[Officer]:
+    """Fetch an officer with roles and permissions loaded (fresh from the database)"""
+    result = await db.execute(
+        select(Officer)
+        .options(_OFFICER_RELATIONS)
+        .where(Officer.officer_id == officer_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _page_total(db: AsyncSession, query, rows, offset: int) -> int:
+    """
+    Total row count for a page fetched with a COUNT(*) OVER () "total" column.
+    Only a page past the end (no rows) needs a separate COUNT query.
+    """
+    if rows:
+        return rows[0].total
+    if offset == 0:
+        return 0
+    return await db.scalar(select(func.count()).select_from(query.subquery()))
 
 
 # ==================== Officer Management ====================
 
 @router.get("/officers/stats", response_model=ApiResponse[dict])
 async def get_officer_stats(
-    current_officer: Officer = Depends(require_permission("users", "read")),
-    db: Session = Depends(get_db)
+    current_officer: OfficerContext = Depends(require_permission("users", "read")),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get officer statistics for admin dashboard.
@@ -33,27 +96,33 @@ async def get_officer_stats(
     """
     try:
         # Total officers
-        total_officers = db.query(Officer).count()
+        total_officers = await db.scalar(select(func.count()).select_from(Officer))
 
         # Active/Inactive officers
-        active_officers = db.query(Officer).filter(Officer.active == True).count()
+        active_officers = await db.scalar(
+            select(func.count()).select_from(Officer).where(Officer.active == True)
+        )
         inactive_officers = total_officers - active_officers
 
         # Role distribution
-        role_dist = db.query(
-            Role.name,
-            func.count(Officer.officer_id)
-        ).join(
-            Officer.roles
-        ).group_by(Role.name).all()
+        role_dist = await db.execute(
+            select(
+                Role.name,
+                func.count(Officer.officer_id)
+            ).select_from(Officer).join(
+                Officer.roles
+            ).group_by(Role.name)
+        )
 
-        role_distribution = {role: count for role, count in role_dist}
+        role_distribution = {role: count for role, count in role_dist.all()}
 
         # Recent additions (last 30 days)
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_additions = db.query(Officer).filter(
-            Officer.created_at >= thirty_days_ago
-        ).count()
+        recent_additions = await db.scalar(
+            select(func.count()).select_from(Officer).where(
+                Officer.created_at >= thirty_days_ago
+            )
+        )
 
         stats = {
             "total_officers": total_officers,
@@ -85,8 +154,8 @@ async def list_officers(
     station: Optional[str] = None,
     active: Optional[bool] = None,
     role: Optional[str] = None,
-    current_officer: Officer = Depends(require_permission("users", "read")),
-    db: Session = Depends(get_db)
+    current_officer: OfficerContext = Depends(require_permission("users", "read")),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List all officers with pagination and filtering.
@@ -95,44 +164,42 @@ async def list_officers(
     """
     try:
         # Build base query
-        query = db.query(Officer)
+        query = select(Officer)
 
         # Apply filters
         if search:
-            query = query.filter(
+            query = query.where(
                 (Officer.name.ilike(f"%{search}%")) |
                 (Officer.badge_number.ilike(f"%{search}%"))
             )
 
         if rank:
-            query = query.filter(Officer.rank == rank)
+            query = query.where(Officer.rank == rank)
 
         if active is not None:
-            query = query.filter(Officer.active == active)
+            query = query.where(Officer.active == active)
 
         if role:
-            query = query.join(Officer.roles).filter(Role.name == role)
-
-        # Get total count
-        total = query.count()
+            query = query.join(Officer.roles).where(Role.name == role)
 
-        # Apply pagination
+        # Apply pagination; the total comes back with the page in one scan
         offset = (page - 1) * limit
-        officers = query.order_by(desc(Officer.created_at)).offset(offset).limit(limit).all()
-
-        # Convert to response format
-        officers_data = [OfficerResponse.model_validate(officer) for officer in officers]
-
-        return ApiResponse(
-            success=True,
-            data={
-                "officers": [officer.model_dump() for officer in officers_data],
-                "total": total,
-                "page": page,
-                "limit": limit,
-                "pages": (total + limit - 1) // limit
-            }
+        result = await db.execute(
+            query.add_columns(func.count().over().label("total"))
+            .options(_OFFICER_RELATIONS)
+            .order_by(desc(Officer.created_at)).offset(offset).limit(limit)
         )
+        rows = result.all()
+        officers = [row[0] for row in rows]
+        total = await _page_total(db, query, rows, offset)
+
+        return ORJSONResponse(api_envelope({
+            "officers": [OfficerResponse.model_validate(officer).model_dump() for officer in officers],
+            "total": total,
+            "page": page,
+            "limit": limit,
+            "pages": (total + limit - 1) // limit
+        }))
 
     except Exception as e:
         logger.error(f"Error listing officers: {e}")
@@ -145,8 +212,8 @@ async def list_officers(
 @router.get("/officers/{officer_id}", response_model=ApiResponse[OfficerResponse])
 async def get_officer(
     officer_id: str,
-    current_officer: Officer = Depends(require_permission("users", "read")),
-    db: Session = Depends(get_db)
+    current_officer: OfficerContext = Depends(require_permission("users", "read")),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get single officer details.
@@ -154,7 +221,7 @@ async def get_officer(
     Requires: users:read permission
     """
     try:
-        officer = db.query(Officer).filter(Officer.officer_id == officer_id).first()
+        officer = await _load_officer(db, officer_id)
 
         if not officer:
             raise HTTPException(
@@ -182,8 +249,8 @@ async def get_officer(
 @router.post("/officers", response_model=ApiResponse[OfficerResponse])
 async def create_officer(
     officer_data: dict,
-    current_officer: Officer = Depends(require_permission("users", "create")),
-    db: Session = Depends(get_db)
+    current_officer: OfficerContext = Depends(require_permission("users", "create")),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new officer.
@@ -192,9 +259,11 @@ async def create_officer(
     """
     try:
         # Check if badge number already exists
-        existing = db.query(Officer).filter(
-            Officer.badge_number == officer_data.get("badge_number")
-        ).first()
+        existing = await db.scalar(
+            select(Officer.officer_id).where(
+                Officer.badge_number == officer_data.get("badge_number")
+            )
+        )
 
         if existing:
             raise HTTPException(
@@ -202,14 +271,14 @@ async def create_officer(
                 detail="Badge number already exists"
             )
 
-        # Hash password
+        # Hash password (bcrypt is CPU-bound; keep it off the event loop)
         password = officer_data.get("password")
         if not password:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Password is required when creating a new officer"
             )
-        password_hash = hash_password(password)
+        password_hash = await asyncio.to_thread(hash_password, password)
 
         # Create officer
         new_officer = Officer(
@@ -222,17 +291,21 @@ async def create_officer(
             two_factor_enabled=False
         )
 
+        # New object: start with an empty (loaded) roles collection
+        new_officer.roles = []
         db.add(new_officer)
-        db.flush()
+        await db.flush()
 
         # Assign roles if provided
         role_ids = officer_data.get("role_ids", [])
         if role_ids:
-            roles = db.query(Role).filter(Role.id.in_(role_ids)).all()
-            new_officer.roles = roles
+            roles = await db.scalars(select(Role).where(Role.id.in_(role_ids)))
+            new_officer.roles = list(roles.all())
 
-        # Log activity
-        activity_log = ActivityLog(
+        await db.commit()
+
+        # Log activity (written in the background, after the change is committed)
+        log_activity(
             officer_id=current_officer.officer_id,
             action="officer_created",
             resource_type="officers",
@@ -243,10 +316,7 @@ async def create_officer(
                 "new_officer_name": new_officer.name
             }
         )
-        db.add(activity_log)
-
-        db.commit()
-        db.refresh(new_officer)
+        new_officer = await _load_officer(db, new_officer.officer_id)
 
         officer_response = OfficerResponse.model_validate(new_officer)
 
@@ -261,7 +331,7 @@ async def create_officer(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating officer: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -273,8 +343,8 @@ async def create_officer(
 async def update_officer(
     officer_id: str,
     officer_data: dict,
-    current_officer: Officer = Depends(require_permission("users", "update")),
-    db: Session = Depends(get_db)
+    current_officer: OfficerContext = Depends(require_permission("users", "update")),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update officer details.
@@ -282,26 +352,40 @@ async def update_officer(
     Requires: users:update permission
     """
     try:
-        officer = db.query(Officer).filter(Officer.officer_id == officer_id).first()
+        # Update allowed fields
+        changes = {
+            field: officer_data[field]
+            for field in ("name", "rank", "department", "active")
+            if field in officer_data
+        }
 
-        if not officer:
+        if changes:
+            # Single UPDATE ... RETURNING: existence check and write in one
+            # round trip, instead of loading the officer first
+            updated_id = await db.scalar(
+                update(Officer)
+                .where(Officer.officer_id == officer_id)
+                .values(**changes)
+                .returning(Officer.officer_id)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            updated_id = await db.scalar(
+                select(Officer.officer_id).where(Officer.officer_id == officer_id)
+            )
+
+        if updated_id is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Officer not found"
             )
 
-        # Update allowed fields
-        if "name" in officer_data:
-            officer.name = officer_data["name"]
-        if "rank" in officer_data:
-            officer.rank = officer_data["rank"]
-        if "department" in officer_data:
-            officer.department = officer_data["department"]
-        if "active" in officer_data:
-            officer.active = officer_data["active"]
-
-        # Log activity
-        activity_log = ActivityLog(
+        await db.commit()
+        await invalidate_officer_profile(officer_id)
+        await invalidate_officer_tokens(officer_id)
+
+        # Log activity (written in the background, after the change is committed)
+        log_activity(
             officer_id=current_officer.officer_id,
             action="officer_updated",
             resource_type="officers",
@@ -311,10 +395,7 @@ async def update_officer(
                 "updated_fields": list(officer_data.keys())
             }
         )
-        db.add(activity_log)
-
-        db.commit()
-        db.refresh(officer)
+        officer = await _load_officer(db, officer_id)
 
         officer_response = OfficerResponse.model_validate(officer)
 
@@ -329,7 +410,7 @@ async def update_officer(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error updating officer: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -341,8 +422,8 @@ async def update_officer(
 async def assign_officer_roles(
     officer_id: str,
     role_data: dict,
-    current_officer: Officer = Depends(require_permission("roles", "assign")),
-    db: Session = Depends(get_db)
+    current_officer: OfficerContext = Depends(require_permission("roles", "assign")),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Assign roles to an officer.
@@ -350,7 +431,7 @@ async def assign_officer_roles(
     Requires: roles:assign permission
     """
     try:
-        officer = db.query(Officer).filter(Officer.officer_id == officer_id).first()
+        officer = await _load_officer(db, officer_id)
 
         if not officer:
             raise HTTPException(
@@ -359,7 +440,8 @@ async def assign_officer_roles(
             )
 
         role_ids = role_data.get("role_ids", [])
-        roles = db.query(Role).filter(Role.id.in_(role_ids)).all()
+        result = await db.scalars(select(Role).where(Role.id.in_(role_ids)))
+        roles = list(result.all())
 
         if len(roles) != len(role_ids):
             raise HTTPException(
@@ -369,8 +451,12 @@ async def assign_officer_roles(
 
         officer.roles = roles
 
-        # Log activity
-        activity_log = ActivityLog(
+        await db.commit()
+        await invalidate_officer_profile(officer_id)
+        await invalidate_officer_tokens(officer_id)
+
+        # Log activity (written in the background, after the change is committed)
+        log_activity(
             officer_id=current_officer.officer_id,
             action="roles_assigned",
             resource_type="officers",
@@ -382,10 +468,7 @@ async def assign_officer_roles(
                 "role_names": [role.name for role in roles]
             }
         )
-        db.add(activity_log)
-
-        db.commit()
-        db.refresh(officer)
+        officer = await _load_officer(db, officer_id)
 
         officer_response = OfficerResponse.model_validate(officer)
 
@@ -400,7 +483,7 @@ async def assign_officer_roles(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error assigning roles: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -412,8 +495,8 @@ async def assign_officer_roles(
 
 @router.get("/roles", response_model=ApiResponse[List[dict]])
 async def list_roles(
-    current_officer: Officer = Depends(require_permission("roles", "manage")),
-    db: Session = Depends(get_db)
+    current_officer: OfficerContext = Depends(require_permission("roles", "manage")),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all roles with their permissions.
@@ -421,7 +504,14 @@ async def list_roles(
     Requires: roles:manage permission
     """
     try:
-        roles = db.query(Role).order_by(Role.level).all()
+        cached = await cache_get(ROLES_CACHE_KEY)
+        if cached is not None:
+            return ORJSONResponse(api_envelope(orjson.Fragment(cached)))
+
+        result = await db.scalars(
+            select(Role).options(selectinload(Role.permissions)).order_by(Role.level)
+        )
+        roles = result.all()
 
         roles_data = []
         for role in roles:
@@ -443,6 +533,8 @@ async def list_roles(
                 ]
             })
 
+        await cache_set(ROLES_CACHE_KEY, orjson.dumps(roles_data), ROLES_CACHE_TTL)
+
         return ApiResponse(
             success=True,
             data=roles_data
@@ -458,8 +550,8 @@ async def list_roles(
 
 @router.get("/permissions", response_model=ApiResponse[List[dict]])
 async def list_permissions(
-    current_officer: Officer = Depends(require_permission("roles", "manage")),
-    db: Session = Depends(get_db)
+    current_officer: OfficerContext = Depends(require_permission("roles", "manage")),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all available permissions.
@@ -467,7 +559,12 @@ async def list_permissions(
     Requires: roles:manage permission
     """
     try:
-        permissions = db.query(Permission).order_by(Permission.resource, Permission.action).all()
+        cached = await cache_get(PERMISSIONS_CACHE_KEY)
+        if cached is not None:
+            return ORJSONResponse(api_envelope(orjson.Fragment(cached)))
+
+        result = await db.scalars(select(Permission).order_by(Permission.resource, Permission.action))
+        permissions = result.all()
 
         perms_data = [
             {
@@ -480,6 +577,8 @@ async def list_permissions(
             for perm in permissions
         ]
 
+        await cache_set(PERMISSIONS_CACHE_KEY, orjson.dumps(perms_data), PERMISSIONS_CACHE_TTL)
+
         return ApiResponse(
             success=True,
             data=perms_data
@@ -501,53 +600,68 @@ async def get_activity_logs(
     limit: int = Query(50, ge=1, le=100),
     action: Optional[str] = None,
     officer_id: Optional[str] = None,
-    current_officer: Officer = Depends(require_permission("logs", "read")),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    current_officer: OfficerContext = Depends(require_permission("logs", "read")),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get activity logs with pagination and filtering.
 
+    Pass the previous response's next_cursor as `cursor` for keyset paging
+    (page is ignored and total/pages are not computed).
+
     Requires: logs:read permission
     """
+    if cursor:
+        try:
+            cursor_ts, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
     try:
-        query = db.query(ActivityLog)
+        query = select(*_ACTIVITY_LOG_COLUMNS)
 
         if action:
-            query = query.filter(ActivityLog.action.ilike(f"%{action}%"))
+            query = query.where(ActivityLog.action.ilike(f"%{action}%"))
 
         if officer_id:
-            query = query.filter(ActivityLog.officer_id == officer_id)
-
-        total = query.count()
-
-        offset = (page - 1) * limit
-        logs = query.order_by(desc(ActivityLog.timestamp)).offset(offset).limit(limit).all()
+            query = query.where(ActivityLog.officer_id == officer_id)
 
-        logs_data = [
-            {
-                "id": log.id,
-                "officer_id": log.officer_id,
-                "action": log.action,
-                "resource_type": log.resource_type,
-                "resource_id": log.resource_id,
-                "ip_address": log.ip_address,
-                "user_agent": log.user_agent,
-                "timestamp": log.timestamp.isoformat() if log.timestamp else None,
-                "details": log.details
-            }
-            for log in logs
-        ]
+        newest_first = (desc(ActivityLog.timestamp), desc(ActivityLog.id))
 
-        return ApiResponse(
-            success=True,
-            data={
-                "logs": logs_data,
-                "total": total,
-                "page": page,
-                "limit": limit,
-                "pages": (total + limit - 1) // limit
-            }
-        )
+        if cursor:
+            # Seek past the cursor row instead of scanning OFFSET rows
+            result = await db.execute(
+                query.where(tuple_(ActivityLog.timestamp, ActivityLog.id) < (cursor_ts, cursor_id))
+                .order_by(*newest_first).limit(limit)
+            )
+            rows = result.all()
+            total = None
+        else:
+            offset = (page - 1) * limit
+            result = await db.execute(
+                query.add_columns(func.count().over().label("total"))
+                .order_by(*newest_first).offset(offset).limit(limit)
+            )
+            rows = result.all()
+            total = await _page_total(db, query, rows, offset)
+
+        # Column rows map straight to the response dicts (no ORM objects)
+        logs_data = [dict(row._mapping) for row in rows]
+        for log in logs_data:
+            log.pop("total", None)
+
+        return ORJSONResponse(api_envelope({
+            "logs": logs_data,
+            "total": total,
+            "page": None if cursor else page,
+            "limit": limit,
+            "pages": None if total is None else (total + limit - 1) // limit,
+            "next_cursor": next_cursor(rows, limit, "timestamp")
+        }))
 
     except Exception as e:
         logger.error(f"Error fetching activity logs: {e}")
@@ -3,21 +3,33 @@ AI Hub API Endpoints
 Manages scraping operations, fraud detection, and AI analysis
 """
 
+import asyncio
+
 from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, desc, func
 from typing import List, Optional
 from datetime import datetime, timedelta
 
-from app.database import get_db
+from app.core.cache import acquire_lock, cache_get, release_lock
+from app.database import get_async_db
 from app.dependencies import get_current_officer
-from app.models.officer import Officer
-from app.schemas import ApiResponse
+from app.schemas import ApiResponse, api_envelope
+from app.services.scraper_jobs import (
+    SCRAPER_LAST_RESULT_KEY,
+    SCRAPER_LOCK_KEY,
+    SCRAPER_LOCK_TTL,
+    run_facebook_feed_scraper,
+)
+from app.utils import OfficerContext, decode_cursor, next_cursor
+from app.worker import facebook_feed_scraper_task
 from pydantic import BaseModel
 from loguru import logger
+import orjson
 
 
-router = APIRouter(prefix="/ai-hub", tags=["AI Hub"])
+router = APIRouter(prefix="/ai-hub", tags=["AI Hub"], default_response_class=ORJSONResponse)
 
 
 # ==================== Schemas ====================
@@ -54,6 +66,85 @@ class ScraperStats(BaseModel):
     fraud_last_24h: int
 
 
+# ==================== Queries ====================
+# Built once at import; asyncpg keeps a prepared statement per SQL string,
+# so identical text on every request also skips the server-side parse
+
+# List pages carry summary fields only: a content preview, and whether an
+# analysis exists. Full content, media and the ai_analysis_result blob come
+# from the detail endpoint.
+# :platform is always bound (NULL = all platforms) so there is one statement
+# for both cases; the CAST lets asyncpg type the parameter when it is NULL
+FRAUD_POSTS_QUERY = text("""
+    SELECT
+        id, platform, author_name, author_profile_url,
+        LEFT(content, 280) AS content_preview, post_url,
+        fraud_confidence, fraud_type, scraped_at, is_fraudulent,
+        ai_analysis_result IS NOT NULL AS has_analysis,
+        COUNT(*) OVER () AS _total
+    FROM ai_scraped_posts
+    WHERE is_fraudulent = true
+    AND fraud_confidence >= :min_confidence
+    AND (CAST(:platform AS TEXT) IS NULL OR platform = :platform)
+    ORDER BY scraped_at DESC, id DESC
+    LIMIT :limit OFFSET :offset
+""")
+
+# Keyset page: seeks past the cursor row instead of reading and discarding
+# OFFSET rows, so deep pages cost the same as the first
+FRAUD_POSTS_AFTER_CURSOR_QUERY = text("""
+    SELECT
+        id, platform, author_name, author_profile_url,
+        LEFT(content, 280) AS content_preview, post_url,
+        fraud_confidence, fraud_type, scraped_at, is_fraudulent,
+        ai_analysis_result IS NOT NULL AS has_analysis
+    FROM ai_scraped_posts
+    WHERE is_fraudulent = true
+    AND fraud_confidence >= :min_confidence
+    AND (CAST(:platform AS TEXT) IS NULL OR platform = :platform)
+    AND (scraped_at, id) < (:cursor_ts, :cursor_id)
+    ORDER BY scraped_at DESC, id DESC
+    LIMIT :limit
+""")
+
+FRAUD_POSTS_COUNT_QUERY = text("""
+    SELECT COUNT(*) as total
+    FROM ai_scraped_posts
+    WHERE is_fraudulent = true
+    AND fraud_confidence >= :min_confidence
+    AND (CAST(:platform AS TEXT) IS NULL OR platform = :platform)
+""")
+
+POST_BY_ID_QUERY = text("""
+    SELECT *
+    FROM ai_scraped_posts
+    WHERE id = :post_id
+""")
+
+# All counters in one round trip (conditional aggregates)
+SCRAPER_STATS_QUERY = text("""
+    SELECT
+        COUNT(*) AS total_posts,
+        COUNT(*) FILTER (WHERE is_fraudulent) AS fraud_count,
+        MAX(scraped_at) AS last_scrape,
+        COUNT(*) FILTER (WHERE scraped_at >= :yesterday) AS posts_24h,
+        COUNT(*) FILTER (WHERE scraped_at >= :yesterday AND is_fraudulent) AS fraud_24h
+    FROM ai_scraped_posts
+""")
+
+MARK_FALSE_POSITIVE_QUERY = text("""
+    UPDATE ai_scraped_posts
+    SET is_fraudulent = false,
+        metadata = jsonb_set(
+            COALESCE(metadata, '{}'::jsonb),
+            '{marked_false_positive}',
+            'true'::jsonb
+        )
+    WHERE id = :post_id
+    RETURNING id
+""")
+
+
 # ==================== Endpoints ====================
 
 @router.get("/fraud-posts", response_model=ApiResponse[dict])
@@ -62,89 +153,66 @@ async def get_fraud_posts(
     limit: int = 20,
     platform: Optional[str] = None,
     min_confidence: float = 0.5,
-    db: Session = Depends(get_db),
-    current_officer: Officer = Depends(get_current_officer)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_officer: OfficerContext = Depends(get_current_officer)
 ):
     """
-    Get detected fraud posts
+    Get detected fraud posts (summary fields; see /fraud-posts/{post_id}
+    for full content, images and AI analysis)
+
+    Pass the previous response's next_cursor as `cursor` for keyset paging
+    (page is ignored and total/pages are not computed). Without a cursor,
+    page-number paging is used.
     """
-    try:
-        offset = (page - 1) * limit
-
-        # Build query
-        query = """
-            SELECT
-                id, platform, author_name, author_profile_url,
-                content, post_url, media_urls as images,
-                fraud_confidence, fraud_type, scraped_at, is_fraudulent,
-                ai_analysis_result
-            FROM ai_scraped_posts
-            WHERE is_fraudulent = true
-            AND fraud_confidence >= :min_confidence
-        """
-
-        if platform:
-            query += " AND platform = :platform"
-
-        query += """
-            ORDER BY scraped_at DESC
-            LIMIT :limit OFFSET :offset
-        """
+    if cursor:
+        try:
+            cursor_ts, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
 
+    try:
         params = {
             'min_confidence': min_confidence,
-            'limit': limit,
-            'offset': offset
+            'platform': platform or None,
+            'limit': limit
         }
 
-        if platform:
-            params['platform'] = platform
-
-        result = db.execute(text(query), params)
-        posts = result.fetchall()
-
-        # Count total
-        count_query = """
-            SELECT COUNT(*) as total
-            FROM ai_scraped_posts
-            WHERE is_fraudulent = true
-            AND fraud_confidence >= :min_confidence
-        """
-
-        if platform:
-            count_query += " AND platform = :platform"
-
-        count_result = db.execute(text(count_query), params)
-        total = count_result.fetchone()[0]
-
-        # Format posts
-        posts_data = []
-        for post in posts:
-            posts_data.append({
-                'id': post.id,
-                'platform': post.platform,
-                'author_name': post.author_name,
-                'author_profile_url': post.author_profile_url,
-                'content': post.content,
-                'post_url': post.post_url,
-                'images': post.images if post.images else [],
-                'fraud_confidence': float(post.fraud_confidence),
-                'fraud_type': post.fraud_type,
-                'scraped_at': post.scraped_at.isoformat(),
-                'is_fraudulent': post.is_fraudulent,
-                'ai_analysis': post.ai_analysis_result if post.ai_analysis_result else {}
-            })
-
-        return ApiResponse(
-            success=True,
-            data={
-                'posts': posts_data,
-                'total': total,
-                'page': page,
-                'limit': limit,
-                'pages': (total + limit - 1) // limit
-            }
-        )
+        if cursor:
+            params['cursor_ts'] = cursor_ts
+            params['cursor_id'] = cursor_id
+            result = await db.execute(FRAUD_POSTS_AFTER_CURSOR_QUERY, params)
+            posts = result.fetchall()
+            total = None
+        else:
+            params['offset'] = (page - 1) * limit
+            result = await db.execute(FRAUD_POSTS_QUERY, params)
+            posts = result.fetchall()
+
+            # Total comes from the window count; only a page past the end
+            # (no rows) needs a separate COUNT
+            if posts:
+                total = posts[0]._total
+            elif params['offset']:
+                total = await db.scalar(FRAUD_POSTS_COUNT_QUERY, params)
+            else:
+                total = 0
+
+        # Rows already carry the response fields (numerics decode to float,
+        # datetimes go to orjson as-is); only the window count is dropped
+        posts_data = [dict(post._mapping) for post in posts]
+        for post in posts_data:
+            post.pop('_total', None)
+
+        # Plain dicts straight to orjson (no pydantic/jsonable_encoder pass)
+        return ORJSONResponse(api_envelope({
+            'posts': posts_data,
+            'total': total,
+            'page': None if cursor else page,
+            'limit': limit,
+            'pages': None if total is None else (total + limit - 1) // limit,
+            'next_cursor': next_cursor(posts, limit, 'scraped_at')
+        }))
 
     except Exception as e:
         logger.error(f"Error fetching fraud posts: {str(e)}")
@@ -154,20 +222,14 @@ async def get_fraud_posts(
 @router.get("/fraud-posts/{post_id}", response_model=ApiResponse[dict])
 async def get_fraud_post_details(
     post_id: int,
-    db: Session = Depends(get_db),
-    current_officer: Officer = Depends(get_current_officer)
+    db: AsyncSession = Depends(get_async_db),
+    current_officer: OfficerContext = Depends(get_current_officer)
 ):
     """
     Get detailed information about a specific fraud post
     """
     try:
-        query = text("""
-            SELECT *
-            FROM ai_scraped_posts
-            WHERE id = :post_id
-        """)
-
-        result = db.execute(query, {'post_id': post_id})
+        result = await db.execute(POST_BY_ID_QUERY, {'post_id': post_id})
         post = result.fetchone()
 
         if not post:
@@ -205,48 +267,26 @@ async def get_fraud_post_details(
 
 @router.get("/stats", response_model=ApiResponse[ScraperStats])
 async def get_scraper_stats(
-    db: Session = Depends(get_db),
-    current_officer: Officer = Depends(get_current_officer)
+    db: AsyncSession = Depends(get_async_db),
+    current_officer: OfficerContext = Depends(get_current_officer)
 ):
     """
     Get scraping statistics
     """
     try:
-        # Total posts scraped
-        total_query = text("SELECT COUNT(*) FROM ai_scraped_posts WHERE is_fraudulent = true")
-        total_result = db.execute(total_query)
-        total_posts = total_result.fetchone()[0]
+        yesterday = datetime.now() - timedelta(hours=24)
+
+        row = (await db.execute(SCRAPER_STATS_QUERY, {'yesterday': yesterday})).one()
 
-        # Fraud detected
-        fraud_query = text("SELECT COUNT(*) FROM ai_scraped_posts WHERE is_fraudulent = true")
-        fraud_result = db.execute(fraud_query)
-        fraud_count = fraud_result.fetchone()[0]
+        total_posts = row.total_posts
+        fraud_count = row.fraud_count
+        last_scrape = row.last_scrape
+        posts_24h = row.posts_24h
+        fraud_24h = row.fraud_24h
 
         # Fraud rate
         fraud_rate = (fraud_count / total_posts * 100) if total_posts > 0 else 0
 
-        # Last scrape
-        last_scrape_query = text("SELECT MAX(scraped_at) FROM ai_scraped_posts")
-        last_scrape_result = db.execute(last_scrape_query)
-        last_scrape = last_scrape_result.fetchone()[0]
-
-        # Last 24h stats
-        yesterday = datetime.now() - timedelta(hours=24)
-
-        posts_24h_query = text("""
-            SELECT COUNT(*) FROM ai_scraped_posts
-            WHERE scraped_at >= :yesterday AND is_fraudulent = true
-        """)
-        posts_24h_result = db.execute(posts_24h_query, {'yesterday': yesterday})
-        posts_24h = posts_24h_result.fetchone()[0]
-
-        fraud_24h_query = text("""
-            SELECT COUNT(*) FROM ai_scraped_posts
-            WHERE scraped_at >= :yesterday AND is_fraudulent = true
-        """)
-        fraud_24h_result = db.execute(fraud_24h_query, {'yesterday': yesterday})
-        fraud_24h = fraud_24h_result.fetchone()[0]
-
         stats = ScraperStats(
             total_posts_scraped=total_posts,
             fraud_detected=fraud_count,
@@ -267,30 +307,56 @@ async def get_scraper_stats(
 async def run_scraper(
     request: ScraperJobRequest,
     background_tasks: BackgroundTasks,
-    current_officer: Officer = Depends(get_current_officer)
+    current_officer: OfficerContext = Depends(get_current_officer)
 ):
     """
     Trigger a scraping job
     Runs in background and returns immediately
+    Returns 409 if the same scraper is already running, and the last run's
+    summary if one finished within the past minute
     """
     try:
         scraper_type = request.scraper_type
 
         logger.info(f"Officer {current_officer.badge_number} triggered {scraper_type} scraper")
 
-        # Add scraping task to background
-        if scraper_type == 'facebook_feed':
-            background_tasks.add_task(
-                _run_facebook_feed_scraper,
-                request.num_batches,
-                request.batch_size
-            )
-        else:
+        if scraper_type != 'facebook_feed':
             raise HTTPException(
                 status_code=400,
                 detail=f"Scraper type '{scraper_type}' not implemented yet"
             )
 
+        last_result = await cache_get(SCRAPER_LAST_RESULT_KEY.format(scraper_type=scraper_type))
+        if last_result is not None:
+            return ApiResponse(
+                success=True,
+                data={
+                    'message': f'{scraper_type} scraper finished recently, returning last result',
+                    'scraper': scraper_type,
+                    'last_result': orjson.loads(last_result)
+                }
+            )
+
+        lock_key = SCRAPER_LOCK_KEY.format(scraper_type=scraper_type)
+        acquired, holder = await acquire_lock(lock_key, current_officer.badge_number, SCRAPER_LOCK_TTL)
+        if not acquired:
+            raise HTTPException(
+                status_code=409,
+                detail=f"{scraper_type} scraper is already running (started by {holder})"
+            )
+
+        # Hand the run to the Celery worker, or run it in this process when
+        # no broker is configured (the job releases the lock when done)
+        job_args = (request.num_batches, request.batch_size, lock_key, current_officer.badge_number)
+        if facebook_feed_scraper_task is not None:
+            try:
+                await asyncio.to_thread(facebook_feed_scraper_task.delay, *job_args)
+            except Exception:
+                await release_lock(lock_key, current_officer.badge_number)
+                raise
+        else:
+            background_tasks.add_task(run_facebook_feed_scraper, *job_args)
+
         return ApiResponse(
             success=True,
             data={
@@ -312,27 +378,15 @@ async def run_scraper(
 @router.delete("/fraud-posts/{post_id}", response_model=ApiResponse[dict])
 async def delete_fraud_post(
     post_id: int,
-    db: Session = Depends(get_db),
-    current_officer: Officer = Depends(get_current_officer)
+    db: AsyncSession = Depends(get_async_db),
+    current_officer: OfficerContext = Depends(get_current_officer)
 ):
     """
     Delete a fraud post (mark as false positive)
     """
     try:
-        query = text("""
-            UPDATE ai_scraped_posts
-            SET is_fraudulent = false,
-                metadata = jsonb_set(
-                    COALESCE(metadata, '{}'::jsonb),
-                    '{marked_false_positive}',
-                    'true'::jsonb
-                )
-            WHERE id = :post_id
-            RETURNING id
-        """)
-
-        result = db.execute(query, {'post_id': post_id})
-        db.commit()
+        result = await db.execute(MARK_FALSE_POSITIVE_QUERY, {'post_id': post_id})
+        await db.commit()
 
         if result.rowcount == 0:
             raise HTTPException(status_code=404, detail="Post not found")
@@ -348,32 +402,5 @@ async def delete_fraud_post(
         raise
     except Exception as e:
         logger.error(f"Error deleting post: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-
-
-# ==================== Background Tasks ====================
-
-async def _run_facebook_feed_scraper(num_batches: int, batch_size: int):
-    """Background task to run Facebook feed scraper"""
-    try:
-        from app.scrapers.facebook.feed_scraper import FacebookFeedScraper
-
-        # TODO: Get credentials from environment or config
-        EMAIL = "your_email@example.com"
-        PASSWORD = "your_password"
-
-        scraper = FacebookFeedScraper(
-            email=EMAIL,
-            password=PASSWORD,
-            headless=True,  # Run headless in background
-            batch_size=batch_size
-        )
-
-        logger.info(f"Starting Facebook feed scraper: {num_batches} batches")
-        result = await scraper.scrape_feed(num_batches=num_batches)
-
-        logger.info(f"Scraper completed: {result}")
-
-    except Exception as e:
-        logger.error(f"Background scraper error: {str(e)}")
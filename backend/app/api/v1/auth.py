@@ -3,34 +3,83 @@ Authentication API endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from datetime import datetime
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import case, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
 from loguru import logger
-
-from app.database import get_db
-from app.dependencies import get_current_officer
-from app.models import Officer, ActivityLog
+import asyncio
+import orjson
+
+from app.core.cache import cache_get, cache_set
+from app.database import get_async_db
+from app.dependencies import (
+    OFFICER_PROFILE_CACHE_KEY,
+    OFFICER_PROFILE_CACHE_TTL,
+    get_current_officer,
+    invalidate_officer_profile,
+)
+from app.models import Officer, Role
+from app.services.activity_logger import log_activity
 from app.schemas import (
     LoginRequest,
     LoginResponse,
     RefreshRequest,
     OfficerResponse,
     ApiResponse,
+    api_envelope,
 )
 from app.utils import (
+    OfficerContext,
+    hash_password,
     verify_password,
+    password_needs_rehash,
     create_token_pair,
     verify_refresh_token,
+    invalidate_officer_tokens,
 )
 
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+router = APIRouter(prefix="/auth", tags=["Authentication"], default_response_class=ORJSONResponse)
+
+# Verified against on unknown badges, so a miss costs the same bcrypt time as
+# a wrong password and badge existence can't be told apart by response time
+_DUMMY_PASSWORD_HASH = hash_password("gaur-dummy-password")
+
+
+def _login_data(tokens: Dict[str, Any], officer_data: Dict[str, Any]) -> Dict[str, Any]:
+    """LoginResponse fields as a plain dict"""
+    return {
+        "access_token": tokens["access_token"],
+        "refresh_token": tokens["refresh_token"],
+        "token_type": tokens["token_type"],
+        "expires_in": tokens["expires_in"],
+        "officer": officer_data
+    }
+
+
+async def _load_officer(db: AsyncSession, criterion) -> Optional[Officer]:
+    """
+    Fetch an officer with roles and permissions loaded for OfficerResponse
+    (async sessions can't lazy-load them during serialization). Sessions keep
+    objects loaded across commit, so the result can be updated and committed
+    and still serialized without another query.
+    """
+    result = await db.execute(
+        select(Officer)
+        .options(selectinload(Officer.roles).selectinload(Role.permissions))
+        .where(criterion)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
 
 
 @router.post("/login", response_model=ApiResponse[LoginResponse])
 async def login(
     credentials: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Authenticate officer and return JWT tokens.
@@ -42,17 +91,26 @@ async def login(
     Returns access token, refresh token, and officer profile.
     """
     try:
-        # Find officer by badge number
-        officer = db.query(Officer).filter(
-            Officer.badge_number == credentials.badge_number
-        ).first()
-
-        if not officer:
+        # Only the columns the checks below need; the full officer (with
+        # roles/permissions) is loaded once the password has been verified
+        credential_row = (await db.execute(
+            select(
+                Officer.officer_id,
+                Officer.password_hash,
+                Officer.locked_until,
+                Officer.active,
+                Officer.failed_login_attempts,
+                Officer.two_factor_enabled,
+            ).where(Officer.badge_number == credentials.badge_number)
+        )).one_or_none()
+
+        if credential_row is None:
             logger.warning(f"Login attempt with invalid badge: {credentials.badge_number}")
 
-            # Log failed attempt
-            activity_log = ActivityLog(
-                officer_id=None,
+            await asyncio.to_thread(verify_password, credentials.password, _DUMMY_PASSWORD_HASH)
+
+            # Log failed attempt (written in the background)
+            log_activity(
                 action="login_failed",
                 details={
                     "badge_number": credentials.badge_number,
@@ -60,47 +118,61 @@ async def login(
                     "success": False
                 }
             )
-            db.add(activity_log)
-            db.commit()
 
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid badge number or password"
             )
 
-        # Check if account is locked
-        if officer.is_locked:
-            logger.warning(f"Login attempt for locked account: {officer.badge_number}")
+        # Check if account is locked (before bcrypt, so probing a locked
+        # account costs no hashing)
+        if credential_row.locked_until and credential_row.locked_until > datetime.utcnow():
+            logger.warning(f"Login attempt for locked account: {credentials.badge_number}")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Account is locked. Please contact administrator."
             )
 
-        # Verify password
-        if not verify_password(credentials.password, officer.password_hash):
+        # Verify password (bcrypt is deliberately slow; keep it off the event loop)
+        password_ok = await asyncio.to_thread(
+            verify_password, credentials.password, credential_row.password_hash
+        )
+        if not password_ok:
             logger.warning(f"Invalid password for badge: {credentials.badge_number}")
 
-            # Increment failed login attempts
-            officer.failed_login_attempts += 1
-
-            # Lock account after 5 failed attempts
-            if officer.failed_login_attempts >= 5:
-                from datetime import timedelta
-                officer.locked_until = datetime.utcnow() + timedelta(hours=1)
-                logger.warning(f"Account locked due to failed attempts: {officer.badge_number}")
-
-            # Log failed attempt
-            activity_log = ActivityLog(
-                officer_id=officer.officer_id,
+            # Increment failed login attempts in the database, so concurrent
+            # bad logins can't overwrite each other's count, and lock the
+            # account after 5 failed attempts in the same statement
+            failed_attempts = Officer.failed_login_attempts + 1
+            result = await db.execute(
+                update(Officer)
+                .where(Officer.officer_id == credential_row.officer_id)
+                .values(
+                    failed_login_attempts=failed_attempts,
+                    locked_until=case(
+                        (failed_attempts >= 5, datetime.utcnow() + timedelta(hours=1)),
+                        else_=Officer.locked_until
+                    )
+                )
+                .returning(Officer.failed_login_attempts)
+            )
+            locked = result.scalar_one() >= 5
+            await db.commit()
+            if locked:
+                logger.warning(f"Account locked due to failed attempts: {credentials.badge_number}")
+                # Sessions resolved from cached tokens must see the lock
+                await invalidate_officer_tokens(credential_row.officer_id)
+
+            # Log failed attempt (written in the background)
+            log_activity(
+                officer_id=credential_row.officer_id,
                 action="login_failed",
                 details={
-                    "badge_number": officer.badge_number,
+                    "badge_number": credentials.badge_number,
                     "description": "Invalid password",
                     "success": False
                 }
             )
-            db.add(activity_log)
-            db.commit()
 
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -108,15 +180,15 @@ async def login(
             )
 
         # Check if officer is active
-        if not officer.is_active:
-            logger.warning(f"Login attempt for inactive account: {officer.badge_number}")
+        if not credential_row.active:
+            logger.warning(f"Login attempt for inactive account: {credentials.badge_number}")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Account is inactive. Please contact administrator."
             )
 
         # Handle 2FA if enabled
-        if officer.two_factor_enabled:
+        if credential_row.two_factor_enabled:
             if not credentials.two_factor_code:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -125,16 +197,33 @@ async def login(
             # TODO: Verify 2FA code (implement later)
             # For now, we'll skip 2FA verification
 
-        # Authentication successful - reset failed attempts
-        officer.failed_login_attempts = 0
-        officer.locked_until = None
-        officer.last_login = datetime.utcnow()
+        # Authentication successful - reset failed attempts, in one UPDATE
+        # (no read-modify-write for concurrent logins to interleave)
+        values = {"failed_login_attempts": 0, "locked_until": None, "last_login": datetime.utcnow()}
+
+        # Upgrade hashes made at a lower BCRYPT_COST while we have the password
+        if password_needs_rehash(credential_row.password_hash):
+            values["password_hash"] = await asyncio.to_thread(hash_password, credentials.password)
+
+        await db.execute(
+            update(Officer)
+            .where(Officer.officer_id == credential_row.officer_id)
+            .values(**values)
+        )
+
+        # Loaded after the UPDATE (same transaction), so the response already
+        # carries the new last_login without a refresh
+        officer = await _load_officer(db, Officer.officer_id == credential_row.officer_id)
 
         # Create JWT tokens
         tokens = create_token_pair(officer.officer_id, officer.badge_number)
 
-        # Log successful login
-        activity_log = ActivityLog(
+        await db.commit()
+        await invalidate_officer_profile(officer.officer_id)
+        await invalidate_officer_tokens(officer.officer_id)
+
+        # Log successful login (written in the background, after the commit)
+        log_activity(
             officer_id=officer.officer_id,
             action="login_success",
             details={
@@ -143,30 +232,13 @@ async def login(
                 "success": True
             }
         )
-        db.add(activity_log)
-        db.commit()
-
-        # Refresh officer to get updated relationships
-        db.refresh(officer)
 
-        # Build response
-        officer_response = OfficerResponse.model_validate(officer)
-
-        login_response = LoginResponse(
-            access_token=tokens["access_token"],
-            refresh_token=tokens["refresh_token"],
-            token_type=tokens["token_type"],
-            expires_in=tokens["expires_in"],
-            officer=officer_response
-        )
+        # Build response (validated once, dumped once)
+        officer_data = OfficerResponse.model_validate(officer).model_dump()
 
         logger.info(f"Officer logged in: {officer.badge_number}")
 
-        return ApiResponse(
-            success=True,
-            data=login_response,
-            message="Login successful"
-        )
+        return ORJSONResponse(api_envelope(_login_data(tokens, officer_data), message="Login successful"))
 
     except HTTPException:
         raise
@@ -180,8 +252,7 @@ async def login(
 
 @router.post("/logout", response_model=ApiResponse[dict])
 async def logout(
-    current_officer: Officer = Depends(get_current_officer),
-    db: Session = Depends(get_db)
+    current_officer: OfficerContext = Depends(get_current_officer),
 ):
     """
     Logout current officer.
@@ -190,8 +261,10 @@ async def logout(
     This endpoint mainly logs the logout activity.
     """
     try:
-        # Log logout activity
-        activity_log = ActivityLog(
+        await invalidate_officer_tokens(current_officer.officer_id)
+
+        # Log logout activity (written in the background)
+        log_activity(
             officer_id=current_officer.officer_id,
             action="logout",
             details={
@@ -200,8 +273,6 @@ async def logout(
                 "success": True
             }
         )
-        db.add(activity_log)
-        db.commit()
 
         logger.info(f"Officer logged out: {current_officer.badge_number}")
 
@@ -222,7 +293,7 @@ async def logout(
 @router.post("/refresh", response_model=ApiResponse[LoginResponse])
 async def refresh_token(
     refresh_request: RefreshRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Refresh access token using refresh token.
@@ -248,45 +319,43 @@ async def refresh_token(
                 detail="Invalid token payload"
             )
 
-        # Get officer from database
-        officer = db.query(Officer).filter(Officer.officer_id == officer_id).first()
-        if not officer:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Officer not found"
+        # Get officer snapshot from the cache, else from the database
+        # (with roles/permissions for the response)
+        cache_key = OFFICER_PROFILE_CACHE_KEY.format(officer_id=officer_id)
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            snapshot = orjson.loads(cached)
+            is_active = snapshot["is_active"]
+            officer_data = snapshot["profile"]
+        else:
+            officer = await _load_officer(db, Officer.officer_id == officer_id)
+            if not officer:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Officer not found"
+                )
+
+            is_active = officer.is_active
+            officer_data = OfficerResponse.model_validate(officer).model_dump()
+            await cache_set(
+                cache_key,
+                orjson.dumps({"is_active": is_active, "profile": officer_data}),
+                OFFICER_PROFILE_CACHE_TTL
             )
 
         # Check if officer is active
-        if not officer.is_active:
+        if not is_active:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Account is inactive"
             )
 
         # Create new token pair
-        tokens = create_token_pair(officer.officer_id, officer.badge_number)
+        tokens = create_token_pair(officer_data["officer_id"], officer_data["badge_number"])
 
-        # Refresh officer to get relationships
-        db.refresh(officer)
+        logger.info(f"Token refreshed for: {officer_data['badge_number']}")
 
-        # Build response
-        officer_response = OfficerResponse.model_validate(officer)
-
-        login_response = LoginResponse(
-            access_token=tokens["access_token"],
-            refresh_token=tokens["refresh_token"],
-            token_type=tokens["token_type"],
-            expires_in=tokens["expires_in"],
-            officer=officer_response
-        )
-
-        logger.info(f"Token refreshed for: {officer.badge_number}")
-
-        return ApiResponse(
-            success=True,
-            data=login_response,
-            message="Token refreshed successfully"
-        )
+        return ORJSONResponse(api_envelope(_login_data(tokens, officer_data), message="Token refreshed successfully"))
 
     except HTTPException:
         raise
@@ -300,8 +369,7 @@ async def refresh_token(
 
 @router.get("/profile", response_model=ApiResponse[OfficerResponse])
 async def get_profile(
-    current_officer: Officer = Depends(get_current_officer),
-    db: Session = Depends(get_db)
+    current_officer: OfficerContext = Depends(get_current_officer)
 ):
     """
     Get current officer's profile.
@@ -309,15 +377,8 @@ async def get_profile(
     Returns officer details including roles and permissions.
     """
     try:
-        # Refresh to ensure relationships are loaded
-        db.refresh(current_officer)
-
-        officer_response = OfficerResponse.model_validate(current_officer)
-
-        return ApiResponse(
-            success=True,
-            data=officer_response
-        )
+        # get_current_officer already resolved the profile
+        return ORJSONResponse(api_envelope(current_officer.profile))
 
     except Exception as e:
         logger.error(f"Get profile error: {e}")
@@ -3,17 +3,83 @@ Threats API Endpoints
 Fetch and manage fraud alerts from ai_fraud_alerts table
 """
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, func
-from typing import List, Optional
-from datetime import datetime, timedelta
-
-from app.database import get_db
-from app.schemas import ApiResponse
+from sqlalchemy.sql.elements import TextClause
+from typing import List, Optional, Tuple
+from functools import lru_cache
+from datetime import date, timedelta
+import hashlib
+import orjson
+
+from app.core.cache import cache_delete, cache_get, cache_set
+from app.database import get_async_db
+from app.schemas import ApiResponse, api_envelope
+from app.utils import decode_cursor, next_cursor
 
 router = APIRouter(prefix="/threats", tags=["threats"])
 
+# Dashboard stats, serialized; dropped when a threat's status changes, and new
+# alerts show up within the TTL (also the browser max-age)
+THREAT_STATS_CACHE_KEY = "threats:stats"
+THREAT_STATS_CACHE_TTL = 15
+
+
+# ==================== Queries ====================
+# Built once per combination of filters and reused: asyncpg keeps a prepared
+# statement per SQL string, so repeat requests skip the server-side parse and
+# plan. Separate statements (rather than one "(:x IS NULL OR col = :x)" form)
+# keep every filter a plain equality the status indexes can serve.
+
+# Columns come back ready for the response: NUMERIC decodes to float on the
+# async engine, JSON columns to Python objects, and datetimes go to orjson as-is
+THREAT_COLUMNS = """
+    id,
+    source_platform,
+    source_id,
+    content_text,
+    COALESCE(confidence_score, 0) AS confidence_score,
+    risk_level,
+    fraud_type,
+    detected_keywords,
+    ai_metadata,
+    status,
+    created_at,
+    resolved_at
+"""
+
+
+def _threats_where(filters: Tuple[str, ...]) -> str:
+    """WHERE clause for the given filter columns (fixed names, never user input)"""
+    return "WHERE 1=1" + "".join(f" AND {column} = :{column}" for column in filters)
+
+
+@lru_cache(maxsize=None)
+def _threats_count_query(filters: Tuple[str, ...]) -> TextClause:
+    """Filter-only COUNT for get_threats"""
+    return text(f"SELECT COUNT(*) FROM ai_fraud_alerts {_threats_where(filters)}")
+
+
+@lru_cache(maxsize=None)
+def _threats_page_query(filters: Tuple[str, ...], keyset: bool) -> TextClause:
+    """Page query for get_threats, most recent first (id breaks timestamp ties)"""
+    where_sql = _threats_where(filters)
+    if keyset:
+        where_sql += " AND (created_at, id) < (:cursor_ts, :cursor_id)"
+        paging = "LIMIT :limit"
+    else:
+        paging = "LIMIT :limit OFFSET :offset"
+
+    return text(f"""
+        SELECT {THREAT_COLUMNS}
+        FROM ai_fraud_alerts
+        {where_sql}
+        ORDER BY created_at DESC, id DESC
+        {paging}
+    """)
+
 
 @router.get("")
 async def get_threats(
@@ -22,7 +88,8 @@ async def get_threats(
     risk_level: Optional[str] = Query(None),
     fraud_type: Optional[str] = Query(None),
     status: Optional[str] = Query("open"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get paginated list of fraud threats from ai_fraud_alerts
@@ -33,90 +100,64 @@ async def get_threats(
     - risk_level: Filter by risk level (HIGH, MEDIUM, LOW)
     - fraud_type: Filter by fraud type
     - status: Filter by status (open, investigating, resolved)
+    - cursor: next_cursor from the previous response, for keyset paging
+      (page is ignored and total/total_pages are not computed)
     """
-    try:
-        # Build query
-        query = """
-            SELECT
-                id,
-                source_platform,
-                source_id,
-                content_text,
-                confidence_score,
-                risk_level,
-                fraud_type,
-                detected_keywords,
-                ai_metadata,
-                status,
-                created_at,
-                resolved_at
-            FROM ai_fraud_alerts
-            WHERE 1=1
-        """
-
-        params = {}
-
-        # Apply filters
-        if risk_level:
-            query += " AND risk_level = :risk_level"
-            params['risk_level'] = risk_level
-
-        if fraud_type:
-            query += " AND fraud_type = :fraud_type"
-            params['fraud_type'] = fraud_type
-
-        if status:
-            query += " AND status = :status"
-            params['status'] = status
-
-        # Order by most recent
-        query += " ORDER BY created_at DESC"
+    if cursor:
+        try:
+            cursor_ts, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            return ApiResponse(
+                success=False,
+                error="Invalid cursor",
+                data={'threats': [], 'pagination': {'page': page, 'size': size, 'total': 0, 'total_pages': 0}}
+            )
 
-        # Get total count
-        count_query = f"SELECT COUNT(*) as total FROM ({query}) as subquery"
-        total_result = db.execute(text(count_query), params)
-        total = total_result.scalar()
+    try:
+        # Only set filters take part; the key picks the cached statement
+        params = {
+            column: value
+            for column, value in (
+                ('risk_level', risk_level),
+                ('fraud_type', fraud_type),
+                ('status', status),
+            )
+            if value
+        }
+        filters = tuple(params)
+
+        if cursor:
+            # Keyset page: seek past the cursor row instead of skipping rows
+            total = None
+            params['cursor_ts'] = cursor_ts
+            params['cursor_id'] = cursor_id
+        else:
+            # Get total count (no ORDER BY / column list: counting needs no sort)
+            total_result = await db.execute(_threats_count_query(filters), params)
+            total = total_result.scalar()
+            params['offset'] = (page - 1) * size
 
-        # Apply pagination
-        offset = (page - 1) * size
-        query += " LIMIT :limit OFFSET :offset"
         params['limit'] = size
-        params['offset'] = offset
+        query = _threats_page_query(filters, keyset=bool(cursor))
 
         # Execute query
-        result = db.execute(text(query), params)
+        result = await db.execute(query, params)
         rows = result.fetchall()
 
-        # Convert to list of dicts
-        threats = []
-        for row in rows:
-            threats.append({
-                'id': row[0],
-                'source_platform': row[1],
-                'source_id': row[2],
-                'content_text': row[3],
-                'confidence_score': float(row[4]) if row[4] else 0.0,
-                'risk_level': row[5],
-                'fraud_type': row[6],
-                'detected_keywords': row[7],  # JSON
-                'ai_metadata': row[8],  # JSON
-                'status': row[9],
-                'created_at': row[10].isoformat() if row[10] else None,
-                'resolved_at': row[11].isoformat() if row[11] else None,
-            })
+        # Rows already carry the response fields; plain dicts straight to
+        # orjson (no per-field conversion, no pydantic/jsonable_encoder pass)
+        threats = [dict(row._mapping) for row in rows]
 
-        return ApiResponse(
-            success=True,
-            data={
-                'threats': threats,
-                'pagination': {
-                    'page': page,
-                    'size': size,
-                    'total': total,
-                    'total_pages': (total + size - 1) // size
-                }
+        return ORJSONResponse(api_envelope({
+            'threats': threats,
+            'pagination': {
+                'page': None if cursor else page,
+                'size': size,
+                'total': total,
+                'total_pages': None if total is None else (total + size - 1) // size,
+                'next_cursor': next_cursor(rows, size, 'created_at')
             }
-        )
+        }))
 
     except Exception as e:
         import traceback
@@ -129,8 +170,76 @@ async def get_threats(
         )
 
 
+async def _compute_threat_stats(db: AsyncSession) -> dict:
+    """Run the dashboard aggregations (see get_threat_stats)"""
+    # One pass over the table: each grouping set is one breakdown, the
+    # empty set is the total
+    stats_query = """
+        SELECT
+            CASE
+                WHEN GROUPING(risk_level) = 0 THEN 'risk'
+                WHEN GROUPING(fraud_type) = 0 THEN 'type'
+                WHEN GROUPING(status) = 0 THEN 'status'
+                ELSE 'total'
+            END AS kind,
+            risk_level,
+            fraud_type,
+            status,
+            COUNT(*) AS count
+        FROM ai_fraud_alerts
+        GROUP BY GROUPING SETS ((), (risk_level), (fraud_type), (status))
+    """
+    result = await db.execute(text(stats_query))
+
+    total = 0
+    by_risk = {}
+    by_type = []
+    by_status = {}
+    for row in result:
+        if row.kind == 'total':
+            total = row.count
+        elif row.kind == 'risk':
+            by_risk[row.risk_level] = row.count
+        elif row.kind == 'type':
+            by_type.append({'type': row.fraud_type, 'count': row.count})
+        else:
+            by_status[row.status] = row.count
+
+    # Top 10 fraud types
+    by_type.sort(key=lambda item: item['count'], reverse=True)
+    by_type = by_type[:10]
+
+    # Per-day counts come from the daily_threat_counts view
+    # (refreshed periodically by app.services.threat_counts)
+    daily_query = """
+        SELECT alert_date, alert_count
+        FROM daily_threat_counts
+        WHERE alert_date >= :start_date
+        ORDER BY alert_date ASC
+    """
+    today = date.today()
+    daily_result = await db.execute(text(daily_query), {'start_date': today - timedelta(days=90)})
+    daily = [{'date': row.alert_date.isoformat(), 'count': row.alert_count} for row in daily_result]
+
+    # Recent activity (last 7 days), newest first
+    recent_start = (today - timedelta(days=7)).isoformat()
+    recent_activity = [day for day in reversed(daily) if day['date'] >= recent_start]
+
+    # Heatmap data (last 90 days, grouped by day)
+    heatmap_data = daily
+
+    return {
+        'total': total,
+        'by_risk': by_risk,
+        'by_type': by_type,
+        'by_status': by_status,
+        'recent_activity': recent_activity,
+        'heatmap': heatmap_data
+    }
+
+
 @router.get("/stats")
-async def get_threat_stats(db: Session = Depends(get_db)):
+async def get_threat_stats(request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Get threat statistics for dashboard
 
@@ -140,76 +249,29 @@ async def get_threat_stats(db: Session = Depends(get_db)):
     - By fraud type
     - By status
     - Recent activity (last 7 days)
+
+    Stats are shared across requests for THREAT_STATS_CACHE_TTL seconds and
+    carry an ETag; a poll with a matching If-None-Match gets an empty 304.
     """
     try:
-        # Total threats
-        total_query = "SELECT COUNT(*) FROM ai_fraud_alerts"
-        total = db.execute(text(total_query)).scalar()
-
-        # By risk level
-        risk_query = """
-            SELECT risk_level, COUNT(*) as count
-            FROM ai_fraud_alerts
-            GROUP BY risk_level
-        """
-        risk_result = db.execute(text(risk_query))
-        by_risk = {row[0]: row[1] for row in risk_result}
-
-        # By fraud type
-        type_query = """
-            SELECT fraud_type, COUNT(*) as count
-            FROM ai_fraud_alerts
-            GROUP BY fraud_type
-            ORDER BY count DESC
-            LIMIT 10
-        """
-        type_result = db.execute(text(type_query))
-        by_type = [{'type': row[0], 'count': row[1]} for row in type_result]
-
-        # By status
-        status_query = """
-            SELECT status, COUNT(*) as count
-            FROM ai_fraud_alerts
-            GROUP BY status
-        """
-        status_result = db.execute(text(status_query))
-        by_status = {row[0]: row[1] for row in status_result}
-
-        # Recent activity (last 7 days)
-        recent_query = """
-            SELECT DATE(created_at) as date, COUNT(*) as count
-            FROM ai_fraud_alerts
-            WHERE created_at >= :start_date
-            GROUP BY DATE(created_at)
-            ORDER BY date DESC
-        """
-        start_date = datetime.now() - timedelta(days=7)
-        recent_result = db.execute(text(recent_query), {'start_date': start_date})
-        recent_activity = [{'date': row[0].isoformat(), 'count': row[1]} for row in recent_result]
-
-        # Heatmap data (last 90 days, grouped by day)
-        heatmap_query = """
-            SELECT DATE(created_at) as date, COUNT(*) as count
-            FROM ai_fraud_alerts
-            WHERE created_at >= :start_date
-            GROUP BY DATE(created_at)
-            ORDER BY date ASC
-        """
-        heatmap_start = datetime.now() - timedelta(days=90)
-        heatmap_result = db.execute(text(heatmap_query), {'start_date': heatmap_start})
-        heatmap_data = [{'date': row[0].isoformat(), 'count': row[1]} for row in heatmap_result]
+        data_json = await cache_get(THREAT_STATS_CACHE_KEY)
+        if data_json is None:
+            # None keys (e.g. alerts without a risk level) serialize as "null"
+            data_json = orjson.dumps(await _compute_threat_stats(db), option=orjson.OPT_NON_STR_KEYS)
+            await cache_set(THREAT_STATS_CACHE_KEY, data_json, THREAT_STATS_CACHE_TTL)
 
-        return ApiResponse(
-            success=True,
-            data={
-                'total': total,
-                'by_risk': by_risk,
-                'by_type': by_type,
-                'by_status': by_status,
-                'recent_activity': recent_activity,
-                'heatmap': heatmap_data
-            }
-        )
+        etag = f'"{hashlib.blake2b(data_json, digest_size=8).hexdigest()}"'
+        headers = {
+            'ETag': etag,
+            'Cache-Control': f'private, max-age={THREAT_STATS_CACHE_TTL}'
+        }
+
+        if_none_match = request.headers.get('if-none-match', '')
+        if etag in (tag.strip() for tag in if_none_match.split(',')):
+            return Response(status_code=304, headers=headers)
+
+        # Pre-serialized data goes into the envelope without re-parsing
+        return ORJSONResponse(api_envelope(orjson.Fragment(data_json)), headers=headers)
 
     except Exception as e:
         import traceback
@@ -226,7 +288,7 @@ async def get_threat_stats(db: Session = Depends(get_db)):
 async def update_threat_status(
     threat_id: int,
     status: str = Query(..., regex="^(open|investigating|resolved)$"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update threat status
@@ -245,12 +307,12 @@ async def update_threat_status(
             RETURNING id
         """
 
-        result = db.execute(text(query), {'status': status, 'threat_id': threat_id})
-        db.commit()
-
+        result = await db.execute(text(query), {'status': status, 'threat_id': threat_id})
         updated = result.fetchone()
+        await db.commit()
 
         if updated:
+            await cache_delete(THREAT_STATS_CACHE_KEY)
             return ApiResponse(
                 success=True,
                 data={'id': updated[0], 'status': status}
@@ -262,7 +324,7 @@ async def update_threat_status(
             )
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return ApiResponse(
             success=False,
             error=f"Failed to update threat status: {str(e)}"
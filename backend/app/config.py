@@ -5,6 +5,7 @@ Uses Pydantic Settings for environment variable management
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List, Optional
+from functools import cached_property
 import os
 from pathlib import Path
 
@@ -26,26 +27,64 @@ class Settings(BaseSettings):
     DB_NAME: str = "gaur_police_db"
     DB_USER: str = "christianofernandes"
     DB_PASSWORD: str = ""
-
-    @property
+    # Set when DB_HOST/DB_PORT point at PgBouncer in transaction pooling mode
+    # (usually port 6432): server-side prepared statements are then disabled
+    DB_PGBOUNCER: bool = False
+
+    # Connection pools (sync and async engine each get one per worker
+    # process); size ≈ concurrent queries per worker
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 5  # seconds to wait for a free connection; fail fast when exhausted
+    DB_POOL_RECYCLE: int = 1800  # seconds; replace connections before server/proxy idle cutoffs
+    # SELECT 1 on every checkout: an extra round trip per request. Recycling
+    # already retires idle connections, and a disconnect error invalidates the
+    # whole pool, so only enable this on networks that drop connections often
+    DB_POOL_PRE_PING: bool = False
+    # Async connections opened at startup, so early requests don't pay
+    # connect + auth (0 disables; capped at DB_POOL_SIZE)
+    DB_POOL_WARM_SIZE: int = 20
+    DB_STATEMENT_CACHE_SIZE: int = 1024  # prepared statements kept per async connection
+    SQL_ECHO: bool = False  # log every SQL statement (noisy and slow; debugging only)
+    # Raise on lazy loads of the authenticated officer's relationships instead
+    # of silently querying (dev/test: surfaces N+1s early)
+    SQL_RAISELOAD: bool = False
+
+    # URLs are built on first access and cached (settings are frozen)
+    @cached_property
     def DATABASE_URL(self) -> str:
         """Construct PostgreSQL database URL"""
         if self.DB_PASSWORD:
             return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         return f"postgresql://{self.DB_USER}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
-    @property
+    @cached_property
     def ASYNC_DATABASE_URL(self) -> str:
         """Construct async PostgreSQL database URL"""
         if self.DB_PASSWORD:
             return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         return f"postgresql+asyncpg://{self.DB_USER}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    # ==================== CACHE SETTINGS ====================
+    REDIS_URL: Optional[str] = None  # e.g. redis://localhost:6379/0 (caching disabled if unset)
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+
+    # ==================== BACKGROUND JOB SETTINGS ====================
+    # Celery broker for scraper jobs; only set it when a worker is running
+    # (celery -A app.worker worker), otherwise scrapers run in the API
+    # process. Set REDIS_URL too, so the worker can release the scraper lock
+    CELERY_BROKER_URL: Optional[str] = None
+    # How often the daily_threat_counts view behind the threat heatmap is refreshed
+    THREAT_COUNTS_REFRESH_SECONDS: int = 60
+
     # ==================== SECURITY SETTINGS ====================
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # bcrypt work factor for new hashes; each +1 doubles hash/verify time
+    # (12 is ~250ms). Stored hashes below it are upgraded at next login
+    BCRYPT_COST: int = 12
 
     # ==================== CORS SETTINGS ====================
     CORS_ORIGINS: List[str] = [
@@ -90,6 +129,9 @@ class Settings(BaseSettings):
     MAX_TEXT_LENGTH: int = 512
 
     # Fraud detection keywords (comprehensive list)
+    # Reference list only - text is scanned by app.ai.fraud_detector, whose
+    # keyword table is compiled once at import into a Hyperscan database
+    # (or Aho-Corasick automaton); match against that, not this list
     FRAUD_KEYWORDS: List[str] = [
         # Payment/Financial - English
         "advance", "payment", "upi", "paytm", "phonepe", "gpay", "send money",
@@ -171,7 +213,8 @@ class Settings(BaseSettings):
         env_file=".env",
         env_file_encoding="utf-8",
         case_sensitive=True,
-        extra="ignore"
+        extra="ignore",
+        frozen=True  # read-only after startup
     )
 
     def __init__(self, **kwargs):
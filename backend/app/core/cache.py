@@ -0,0 +1,167 @@
+"""
+Redis response cache and locks
+
+Shared async Redis client for hot, rarely-changing data. Caching is
+best-effort: with REDIS_URL unset, redis not installed, or Redis
+unreachable, reads miss and writes are skipped, so callers simply fall
+back to the database.
+
+Locks (SET NX EX) fall back to an in-process table when Redis is not
+available, which still guards a single-worker deployment.
+"""
+
+import time
+from typing import Dict, Optional, Tuple
+from loguru import logger
+
+from app.config import settings
+
+try:
+    from redis import asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:
+    aioredis = None
+    RedisError = OSError
+
+
+_client: Optional["aioredis.Redis"] = None
+
+# Fallback locks when Redis is unavailable: key -> (owner, expires_at)
+_local_locks: Dict[str, Tuple[str, float]] = {}
+
+# Delete the lock only if we still hold it (it may have expired and been
+# taken by someone else)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def get_redis() -> Optional["aioredis.Redis"]:
+    """
+    Get the shared Redis client, creating it on first use.
+
+    Returns:
+        Redis client, or None if caching is not configured
+    """
+    global _client
+
+    if _client is None and aioredis is not None and settings.REDIS_URL:
+        _client = aioredis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+    return _client
+
+
+async def cache_get(key: str) -> Optional[bytes]:
+    """
+    Read a cached value.
+
+    Returns:
+        Cached bytes, or None on a miss or if Redis is unavailable
+    """
+    client = get_redis()
+    if client is None:
+        return None
+
+    try:
+        return await client.get(key)
+    except (RedisError, OSError) as e:
+        logger.warning(f"Redis GET {key} failed: {e}")
+        return None
+
+
+async def cache_set(key: str, value: bytes, ttl: int) -> None:
+    """
+    Store a value with an expiry (seconds). Failures are logged, not raised.
+    """
+    client = get_redis()
+    if client is None:
+        return
+
+    try:
+        await client.set(key, value, ex=ttl)
+    except (RedisError, OSError) as e:
+        logger.warning(f"Redis SET {key} failed: {e}")
+
+
+async def cache_delete(*keys: str) -> None:
+    """
+    Invalidate cached values. Failures are logged, not raised.
+    """
+    client = get_redis()
+    if client is None or not keys:
+        return
+
+    try:
+        await client.delete(*keys)
+    except (RedisError, OSError) as e:
+        logger.warning(f"Redis DELETE {keys} failed: {e}")
+
+
+async def acquire_lock(key: str, owner: str, ttl: int) -> Tuple[bool, Optional[str]]:
+    """
+    Try to take a lock that expires after ttl seconds.
+
+    Args:
+        key: Lock name
+        owner: Identifier stored as the lock value (shown to other callers)
+        ttl: Expiry in seconds, so a crashed holder can't block forever
+
+    Returns:
+        Tuple of (acquired, current holder if not acquired)
+    """
+    client = get_redis()
+    if client is not None:
+        try:
+            if await client.set(key, owner, nx=True, ex=ttl):
+                return True, None
+            holder = await client.get(key)
+            return False, holder.decode() if holder else None
+        except (RedisError, OSError) as e:
+            logger.warning(f"Redis lock {key} failed, using local lock: {e}")
+
+    now = time.monotonic()
+    holder = _local_locks.get(key)
+    if holder is not None and holder[1] > now:
+        return False, holder[0]
+    _local_locks[key] = (owner, now + ttl)
+    return True, None
+
+
+async def release_lock(key: str, owner: str) -> None:
+    """
+    Release a lock taken with acquire_lock, if owner still holds it.
+    Failures are logged, not raised (the lock then expires on its own).
+    """
+    holder = _local_locks.get(key)
+    if holder is not None and holder[0] == owner:
+        del _local_locks[key]
+
+    client = get_redis()
+    if client is None:
+        return
+
+    try:
+        await client.eval(_RELEASE_LOCK_SCRIPT, 1, key, owner)
+    except (RedisError, OSError) as e:
+        logger.warning(f"Redis unlock {key} failed: {e}")
+
+
+async def close_redis() -> None:
+    """
+    Close the Redis connection pool.
+    Call during application shutdown.
+    """
+    global _client
+
+    if _client is not None:
+        try:
+            await _client.aclose()
+        except (RedisError, OSError) as e:
+            logger.error(f"Error closing Redis connection: {e}")
+        _client = None
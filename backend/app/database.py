@@ -3,11 +3,14 @@
 Database configuration and session management
 """
 
-from sqlalchemy import create_engine, pool, text
+from sqlalchemy import create_engine, event, pool, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import NullPool
-from typing import Generator
+from typing import AsyncGenerator, Generator
+from uuid import uuid4
+import asyncio
 import time
 from loguru import logger
 
@@ -17,10 +20,12 @@ from app.config import settings
 engine = create_engine(
     settings.DATABASE_URL,
     poolclass=pool.QueuePool,
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True,  # Verify connections before using
-    echo=settings.DEBUG,  # Log SQL statements in debug mode
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    echo=settings.SQL_ECHO,  # Log SQL statements when explicitly enabled
 )
 
 # Create SessionLocal class for database sessions
@@ -30,6 +35,54 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# asyncpg prepares every statement server-side. Behind PgBouncer in transaction
+# mode consecutive transactions can land on different server connections, so
+# statements must not be cached across transactions and need unique names.
+# The app-side pools stay: connections to PgBouncer are cheap to hold open.
+if settings.DB_PGBOUNCER:
+    _asyncpg_connect_args = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+else:
+    _asyncpg_connect_args = {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+
+# Async engine (asyncpg) for endpoints that must not block the event loop
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    echo=settings.SQL_ECHO,
+    connect_args=_asyncpg_connect_args,
+)
+
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def _register_asyncpg_codecs(dbapi_connection, connection_record):
+    """
+    Decode NUMERIC as float on async connections, so rows (fraud_confidence
+    etc.) can go straight to orjson without per-row Decimal -> float casts.
+    """
+    dbapi_connection.run_async(
+        lambda conn: conn.set_type_codec(
+            "numeric", encoder=str, decoder=float, schema="pg_catalog", format="text"
+        )
+    )
+
+
+# Objects stay usable after commit (no implicit lazy refresh, which async
+# sessions can't do)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Create declarative base for models
 Base = declarative_base()
 
@@ -50,6 +103,20 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for async FastAPI endpoints to get an async database session.
+
+    Usage:
+        @app.get("/endpoint")
+        async def endpoint(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(Model))
+            ...
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db(max_retries: int = 5, retry_delay: int = 2) -> bool:
     """
     Initialize database connection with retry logic.
@@ -83,6 +150,34 @@ def init_db(max_retries: int = 5, retry_delay: int = 2) -> bool:
     return False
 
 
+async def warm_async_pool() -> None:
+    """
+    Open DB_POOL_WARM_SIZE async connections concurrently and return them to
+    the pool. Failures are logged, not raised (the pool then fills on demand).
+    Call during application startup.
+    """
+    size = min(settings.DB_POOL_WARM_SIZE, settings.DB_POOL_SIZE)
+    if size <= 0:
+        return
+
+    async def _open():
+        conn = await async_engine.connect()
+        await conn.execute(text("SELECT 1"))
+        return conn
+
+    # All held at once, so each task gets its own connection
+    results = await asyncio.gather(*(_open() for _ in range(size)), return_exceptions=True)
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    for conn in opened:
+        await conn.close()
+
+    if len(opened) < size:
+        errors = [e for e in results if isinstance(e, BaseException)]
+        logger.warning(f"Warmed {len(opened)}/{size} database connections: {errors[0]}")
+    else:
+        logger.info(f"Warmed {size} database connections")
+
+
 def create_tables():
     """
     Create all database tables defined in models.
@@ -96,6 +191,70 @@ def create_tables():
         raise
 
 
+# Indexes for the hot list endpoints (fraud post feed, audit log, officer search).
+# CONCURRENTLY builds without locking writers; IF NOT EXISTS makes reruns free.
+PERFORMANCE_INDEXES = [
+    # get_fraud_posts / count: fraud rows newest first, confidence filtered in-index
+    """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_scraped_fraud_partial
+       ON ai_scraped_posts (scraped_at DESC, fraud_confidence)
+       WHERE is_fraudulent = true""",
+    # get_fraud_posts with a platform filter
+    """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_scraped_platform_fraud
+       ON ai_scraped_posts (platform, scraped_at DESC)
+       WHERE is_fraudulent = true""",
+    # get_threats: equality on status, newest first; the INCLUDE columns let
+    # the filtered COUNT run as an index-only scan
+    """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_fraud_alerts_status_created
+       ON ai_fraud_alerts (status, created_at DESC, id DESC)
+       INCLUDE (risk_level, fraud_type)""",
+    # get_threats default view (status=open)
+    """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_fraud_alerts_open_created
+       ON ai_fraud_alerts (created_at DESC, id DESC)
+       WHERE status = 'open'""",
+    # get_activity_logs, unfiltered and per officer
+    """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_activity_logs_timestamp
+       ON activity_logs (timestamp DESC)""",
+    """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_activity_logs_officer_timestamp
+       ON activity_logs (officer_id, timestamp DESC)""",
+    # list_officers search: '%term%' ILIKE can't use a B-tree, trigram GIN can
+    # (the extension needs CREATE privilege; without it these are skipped)
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_officers_name_trgm
+       ON officers USING gin (name gin_trgm_ops)""",
+    """CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_officers_badge_trgm
+       ON officers USING gin (badge_number gin_trgm_ops)""",
+    # Threat heatmap / recent activity read per-day counts from this view
+    # instead of grouping ai_fraud_alerts on every dashboard load. The unique
+    # index is required for REFRESH ... CONCURRENTLY (app.services.threat_counts)
+    """CREATE MATERIALIZED VIEW IF NOT EXISTS daily_threat_counts AS
+       SELECT DATE(created_at) AS alert_date, COUNT(*) AS alert_count
+       FROM ai_fraud_alerts
+       GROUP BY DATE(created_at)""",
+    """CREATE UNIQUE INDEX IF NOT EXISTS ix_daily_threat_counts_date
+       ON daily_threat_counts (alert_date)""",
+]
+
+
+def create_indexes():
+    """
+    Create performance indexes (and the daily_threat_counts view) that
+    aren't declared on the models.
+    A one-off deploy step, not run at startup (CONCURRENTLY builds can take
+    minutes on large tables): python -m app.database create-indexes
+    Each statement runs independently; failures are logged, not raised.
+    Note: an interrupted CONCURRENTLY build leaves an INVALID index that
+    IF NOT EXISTS will skip - drop it manually and restart to rebuild.
+    """
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for statement in PERFORMANCE_INDEXES:
+            try:
+                conn.execute(text(statement))
+            except Exception as e:
+                logger.warning(f"Could not create index: {e}")
+    logger.info("Database indexes created/verified")
+
+
 def check_db_health() -> dict:
     """
     Check database connection health.
@@ -131,3 +290,27 @@ def close_db():
         logger.info("Database connections closed successfully")
     except Exception as e:
         logger.error(f"Error closing database connections: {e}")
+
+
+async def close_async_db():
+    """
+    Dispose the async engine's connection pool.
+    Call during application shutdown.
+    """
+    try:
+        await async_engine.dispose()
+        logger.info("Async database connections closed successfully")
+    except Exception as e:
+        logger.error(f"Error closing async database connections: {e}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="GAUR database maintenance")
+    parser.add_argument("command", choices=["create-indexes"])
+    args = parser.parse_args()
+
+    if args.command == "create-indexes":
+        create_indexes()
+    close_db()
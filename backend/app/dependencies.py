@@ -2,14 +2,27 @@
 FastAPI dependencies for authentication, authorization, and database access
 """
 
-from typing import Optional
+from typing import Optional, Set, Tuple
+import time
 from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, selectinload
 from loguru import logger
 
-from app.database import get_db
-from app.models import Officer
+from app.config import settings
+from app.core.cache import cache_delete
+from app.database import get_async_db
+from app.models import Officer, Role
+from app.schemas import OfficerResponse
+from app.utils.auth_cache import (
+    AUTH_TOKEN_CACHE_TTL,
+    OfficerContext,
+    get_cached_officer,
+    hash_token,
+    set_cached_officer,
+)
 from app.utils.security import verify_access_token, extract_token_from_header
 from app.utils.exceptions import AuthenticationException, AuthorizationException
 
@@ -17,94 +30,156 @@ from app.utils.exceptions import AuthenticationException, AuthorizationException
 # HTTP Bearer security scheme
 security = HTTPBearer()
 
+# Loader options for the authenticated officer: roles and their permissions
+# come in two selectin queries. With SQL_RAISELOAD, any other relationship
+# touched on it raises instead of lazy-loading
+OFFICER_LOAD_OPTIONS = (
+    selectinload(Officer.roles).selectinload(Role.permissions),
+    *((raiseload("*"),) if settings.SQL_RAISELOAD else ()),
+)
 
-async def get_current_officer(
-    authorization: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
-) -> Officer:
-    """
-    Dependency to get current authenticated officer from JWT token.
+# Officer snapshot for /auth/refresh: {"is_active": ..., "profile": OfficerResponse}.
+# Dropped on login and admin changes; the TTL covers other writers
+OFFICER_PROFILE_CACHE_KEY = "officer:{officer_id}"
+OFFICER_PROFILE_CACHE_TTL = 60
 
-    Args:
-        authorization: Authorization header with Bearer token
-        db: Database session
 
-    Returns:
-        Officer object if authentication successful
+def build_officer_context(officer: Officer) -> OfficerContext:
+    """
+    Build the cacheable context for an officer loaded with
+    OFFICER_LOAD_OPTIONS.
+    """
+    return OfficerContext(
+        officer_id=officer.officer_id,
+        badge_number=officer.badge_number,
+        active=officer.active,
+        locked_until=officer.locked_until,
+        role_names=frozenset(officer.role_names),
+        minimum_role_level=officer.minimum_role_level,
+        permissions=frozenset(get_officer_permissions(officer)),
+        profile=OfficerResponse.model_validate(officer).model_dump(),
+    )
+
+
+# Failure reasons from _resolve_officer -> (status code, detail)
+_AUTH_FAILURES = {
+    "missing_header": (status.HTTP_401_UNAUTHORIZED, "Missing authentication credentials"),
+    "malformed_header": (status.HTTP_401_UNAUTHORIZED, "Invalid authentication credentials"),
+    "invalid_token": (status.HTTP_401_UNAUTHORIZED, "Invalid or expired token"),
+    "invalid_payload": (status.HTTP_401_UNAUTHORIZED, "Invalid token payload"),
+    "not_found": (status.HTTP_401_UNAUTHORIZED, "Officer not found"),
+    "inactive": (status.HTTP_403_FORBIDDEN, "Officer account is inactive"),
+    "locked": (status.HTTP_403_FORBIDDEN, "Officer account is locked"),
+}
+
+
+async def _resolve_officer(
+    authorization: Optional[str],
+    db: AsyncSession
+) -> Tuple[Optional[OfficerContext], Optional[str]]:
+    """
+    Resolve the officer for an Authorization header without raising.
+    Resolved officers are cached per token (app.utils.auth_cache).
 
-    Raises:
-        HTTPException: If authentication fails
+    Returns:
+        Tuple of (officer, None) on success, or (None, reason) where reason
+        is a key of _AUTH_FAILURES
     """
     if not authorization:
-        logger.warning("Missing Authorization header")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        return None, "missing_header"
 
-    # Extract token from header
+    # Extract token from header. Malformed headers are cheap to send in
+    # bulk, so they're rejected without a warning per request
     token = extract_token_from_header(authorization)
     if not token:
-        logger.warning("Invalid Authorization header format")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        logger.debug("Invalid Authorization header format")
+        return None, "malformed_header"
 
-    # Verify token
-    payload = verify_access_token(token)
+    # Verify token (signature checks are cached per token hash; rejections
+    # briefly, so replayed bad tokens don't reach the JWT verifier again)
+    token_hash = hash_token(token)
+    payload = verify_access_token(token, token_hash)
     if not payload:
         logger.warning("Invalid or expired token")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        return None, "invalid_token"
 
     # Extract officer ID from payload
     officer_id = payload.get("sub")
     if not officer_id:
         logger.error("Token payload missing 'sub' claim")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token payload",
-            headers={"WWW-Authenticate": "Bearer"},
+        return None, "invalid_payload"
+
+    hit, officer = await get_cached_officer(token_hash)
+
+    if not hit:
+        # Get officer from database, with roles and permissions in the same
+        # round of queries (RBAC checks and the profile then need none)
+        result = await db.execute(
+            select(Officer)
+            .options(*OFFICER_LOAD_OPTIONS)
+            .where(Officer.officer_id == officer_id)
         )
+        db_officer = result.scalar_one_or_none()
+        officer = build_officer_context(db_officer) if db_officer else None
+
+        # Never cached past the token's own expiry
+        ttl = int(payload["exp"] - time.time()) if payload.get("exp") else AUTH_TOKEN_CACHE_TTL
+        if ttl > 0:
+            await set_cached_officer(token_hash, officer, ttl)
 
-    # Get officer from database
-    officer = db.query(Officer).filter(Officer.officer_id == officer_id).first()
     if not officer:
         logger.warning(f"Officer not found: {officer_id}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Officer not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        return None, "not_found"
 
     # Check if officer is active
     if not officer.is_active:
         logger.warning(f"Inactive officer attempted access: {officer.badge_number}")
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Officer account is inactive",
-        )
+        return None, "inactive"
 
     # Check if account is locked
     if officer.is_locked:
         logger.warning(f"Locked officer attempted access: {officer.badge_number}")
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Officer account is locked",
-        )
+        return None, "locked"
+
+    return officer, None
 
-    return officer
+
+async def get_current_officer(
+    authorization: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+) -> OfficerContext:
+    """
+    Dependency to get current authenticated officer from JWT token.
+
+    Args:
+        authorization: Authorization header with Bearer token
+        db: Database session (used on a cache miss)
+
+    Returns:
+        OfficerContext if authentication successful
+
+    Raises:
+        HTTPException: If authentication fails
+    """
+    officer, reason = await _resolve_officer(authorization, db)
+    if officer is not None:
+        return officer
+
+    if reason == "missing_header":
+        logger.warning("Missing Authorization header")
+
+    status_code, detail = _AUTH_FAILURES[reason]
+    raise HTTPException(
+        status_code=status_code,
+        detail=detail,
+        # Only 401s invite the client to (re)authenticate
+        headers={"WWW-Authenticate": "Bearer"} if status_code == status.HTTP_401_UNAUTHORIZED else None,
+    )
 
 
 async def get_current_active_officer(
-    current_officer: Officer = Depends(get_current_officer)
-) -> Officer:
+    current_officer: OfficerContext = Depends(get_current_officer)
+) -> OfficerContext:
     """
     Dependency to ensure officer is active.
     This is a more explicit version of get_current_officer.
@@ -112,6 +187,35 @@ async def get_current_active_officer(
     return current_officer
 
 
+def get_officer_permissions(officer: Officer) -> Set[str]:
+    """
+    Get an officer's permissions as "resource:action" strings; "*" means
+    super_admin. Uses the officer's loaded roles.
+
+    Args:
+        officer: Authenticated officer
+
+    Returns:
+        Set of permission strings
+    """
+    permissions = {
+        f"{permission.resource}:{permission.action}"
+        for role in officer.roles
+        for permission in role.permissions
+    }
+    if any(role.name == "super_admin" for role in officer.roles):
+        permissions.add("*")
+    return permissions
+
+
+async def invalidate_officer_profile(officer_id: str) -> None:
+    """
+    Drop an officer's cached profile snapshot (call after changing the officer
+    or their roles).
+    """
+    await cache_delete(OFFICER_PROFILE_CACHE_KEY.format(officer_id=officer_id))
+
+
 def require_permission(resource: str, action: str):
     """
     Dependency factory to check if officer has specific permission.
@@ -126,36 +230,26 @@ def require_permission(resource: str, action: str):
     Example:
         @app.get("/alerts", dependencies=[Depends(require_permission("alerts", "read"))])
     """
+    required = f"{resource}:{action}"
 
     async def permission_checker(
-        current_officer: Officer = Depends(get_current_officer)
-    ) -> Officer:
+        current_officer: OfficerContext = Depends(get_current_officer)
+    ) -> OfficerContext:
         """Check if officer has required permission"""
 
-        # SuperAdmin bypasses all permission checks
-        if any(role.name == "super_admin" for role in current_officer.roles):
-            return current_officer
+        permissions = current_officer.permissions
 
-        # Check if officer has the specific permission
-        has_permission = False
-        for role in current_officer.roles:
-            for permission in role.permissions:
-                if permission.resource == resource and permission.action == action:
-                    has_permission = True
-                    break
-            if has_permission:
-                break
-
-        if not has_permission:
-            logger.warning(
-                f"Officer {current_officer.badge_number} lacks permission: {resource}:{action}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Insufficient permissions: {resource}:{action}",
-            )
+        # SuperAdmin bypasses all permission checks; otherwise one set lookup
+        if "*" in permissions or required in permissions:
+            return current_officer
 
-        return current_officer
+        logger.warning(
+            f"Officer {current_officer.badge_number} lacks permission: {required}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Insufficient permissions: {required}",
+        )
 
     return permission_checker
 
@@ -175,8 +269,8 @@ def require_role(role_name: str):
     """
 
     async def role_checker(
-        current_officer: Officer = Depends(get_current_officer)
-    ) -> Officer:
+        current_officer: OfficerContext = Depends(get_current_officer)
+    ) -> OfficerContext:
         """Check if officer has required role"""
 
         if role_name not in current_officer.role_names:
@@ -208,8 +302,8 @@ def require_minimum_level(min_level: int):
     """
 
     async def level_checker(
-        current_officer: Officer = Depends(get_current_officer)
-    ) -> Officer:
+        current_officer: OfficerContext = Depends(get_current_officer)
+    ) -> OfficerContext:
         """Check if officer has sufficient role level"""
 
         if current_officer.minimum_role_level > min_level:
@@ -229,8 +323,8 @@ def require_minimum_level(min_level: int):
 # Optional authentication (doesn't fail if token is missing)
 async def get_optional_officer(
     authorization: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
-) -> Optional[Officer]:
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[OfficerContext]:
     """
     Dependency to get current officer if authenticated, None otherwise.
     Used for endpoints that work with or without authentication.
@@ -240,12 +334,7 @@ async def get_optional_officer(
         db: Database session
 
     Returns:
-        Officer object if authenticated, None otherwise
+        OfficerContext if authenticated, None otherwise
     """
-    if not authorization:
-        return None
-
-    try:
-        return await get_current_officer(authorization, db)
-    except HTTPException:
-        return None
+    officer, _ = await _resolve_officer(authorization, db)
+    return officer
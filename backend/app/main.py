@@ -6,14 +6,27 @@ FastAPI application with authentication, CORS, and middleware
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
+import asyncio
 import time
 from loguru import logger
 
 from app.config import settings
-from app.database import init_db, close_db, check_db_health
+from app.database import (
+    init_db,
+    close_db,
+    close_async_db,
+    check_db_health,
+    warm_async_pool,
+)
+from app.ai.openai_client import close_openai_clients, warmup_openai_client
+from app.core.cache import close_redis
+from app.services.activity_logger import start_activity_logger, stop_activity_logger
+from app.services.threat_counts import start_threat_counts_refresher, stop_threat_counts_refresher
 from app.api.v1 import api_router
 from app.utils.exceptions import GaurException
 from app.schemas import ApiResponse, HealthResponse
@@ -36,6 +49,14 @@ async def lifespan(app: FastAPI):
         logger.error("Failed to establish database connection")
         raise RuntimeError("Database connection failed")
 
+    await warm_async_pool()
+    start_activity_logger()
+    start_threat_counts_refresher()
+
+    # Warm the OpenAI connection pool in the background so the first GPT
+    # analysis doesn't pay DNS + TLS setup (doesn't delay startup)
+    warmup_task = asyncio.create_task(warmup_openai_client())
+
     # TODO: Load AI models (Phase 2)
     # TODO: Start background scheduler (Phase 3)
 
@@ -45,8 +66,15 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down GAUR Backend...")
+    warmup_task.cancel()
+    await close_openai_clients()
+    await close_redis()
+    await stop_activity_logger()
+    await stop_threat_counts_refresher()
+    await close_async_db()
     close_db()
     logger.info("GAUR Backend shutdown complete")
+    await logger.complete()
 
 
 # ==================== FastAPI App ====================
@@ -58,7 +86,8 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -66,34 +95,60 @@ app = FastAPI(
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
+    allow_origins=frozenset(settings.CORS_ORIGINS),  # per-request membership check
     allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
     allow_methods=settings.CORS_ALLOW_METHODS,
     allow_headers=settings.CORS_ALLOW_HEADERS,
 )
 
 
+# ==================== Compression Middleware ====================
+
+# List endpoints return tens of KB of JSON per page; skip tiny responses
+# where compression overhead outweighs the savings
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+
 # ==================== Request Logging Middleware ====================
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all HTTP requests with timing information"""
-    start_time = time.time()
+class AccessLogMiddleware:
+    """
+    Log all HTTP requests with timing information.
 
-    # Process request
-    response = await call_next(request)
+    Plain ASGI rather than @app.middleware("http"), which runs every request
+    through BaseHTTPMiddleware (an extra task and a streaming response
+    wrapper per request).
+    """
 
-    # Calculate duration
-    duration = time.time() - start_time
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_ns = time.perf_counter_ns()
+        status_code = 500  # if the app fails before starting a response
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Arguments, not an f-string: nothing is formatted when INFO is filtered
+            logger.info(
+                "{} {} - Status: {} - Duration: {:.3f}ms",
+                scope["method"], scope["path"], status_code,
+                (time.perf_counter_ns() - start_ns) / 1e6,
+            )
 
-    # Log request
-    logger.info(
-        f"{request.method} {request.url.path} "
-        f"- Status: {response.status_code} "
-        f"- Duration: {duration:.3f}s"
-    )
 
-    return response
+app.add_middleware(AccessLogMiddleware)
 
 
 # ==================== Exception Handlers ====================
@@ -103,7 +158,7 @@ async def gaur_exception_handler(request: Request, exc: GaurException):
     """Handle custom GAUR exceptions"""
     logger.error(f"GAUR Exception: {exc.message}")
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "success": False,
@@ -118,12 +173,13 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     """Handle Pydantic validation errors"""
     logger.warning(f"Validation error: {exc.errors()}")
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
         content={
             "success": False,
             "error": "Validation error",
-            "detail": exc.errors(),
+            # errors() may hold exception objects (ctx) orjson can't encode
+            "detail": jsonable_encoder(exc.errors()),
             "timestamp": time.time()
         }
     )
@@ -134,7 +190,7 @@ async def general_exception_handler(request: Request, exc: Exception):
     """Handle all other exceptions"""
     logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "success": False,
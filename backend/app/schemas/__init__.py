@@ -4,6 +4,7 @@ Pydantic schemas for API validation and serialization
 
 from app.schemas.common import (
     ApiResponse,
+    api_envelope,
     PaginatedResponse,
     PaginationMeta,
     ErrorResponse,
@@ -28,6 +29,7 @@ from app.schemas.auth import (
 __all__ = [
     # Common
     "ApiResponse",
+    "api_envelope",
     "PaginatedResponse",
     "PaginationMeta",
     "ErrorResponse",
@@ -7,6 +7,9 @@ from typing import List, Optional
 from datetime import datetime
 
 
+# Response schemas are frozen: they are built from ORM rows, serialized and
+# discarded, never modified in between
+
 # ==================== Permission Schemas ====================
 
 class PermissionBase(BaseModel):
@@ -21,7 +24,7 @@ class PermissionResponse(PermissionBase):
     """Permission response schema"""
     id: int
 
-    model_config = {"from_attributes": True}
+    model_config = {"from_attributes": True, "frozen": True}
 
 
 # ==================== Role Schemas ====================
@@ -40,7 +43,7 @@ class RoleResponse(RoleBase):
     created_at: datetime
     permissions: List[PermissionResponse] = []
 
-    model_config = {"from_attributes": True}
+    model_config = {"from_attributes": True, "frozen": True}
 
 
 class RoleSimple(BaseModel):
@@ -51,7 +54,7 @@ class RoleSimple(BaseModel):
     description: Optional[str] = None
     level: int
 
-    model_config = {"from_attributes": True}
+    model_config = {"from_attributes": True, "frozen": True}
 
 
 # ==================== Officer Schemas ====================
@@ -99,7 +102,7 @@ class OfficerResponse(OfficerBase):
     role_names: List[str] = []
     minimum_role_level: int
 
-    model_config = {"from_attributes": True}
+    model_config = {"from_attributes": True, "frozen": True}
 
 
 # ==================== Authentication Schemas ====================
@@ -3,20 +3,25 @@ Common schemas and response models
 """
 
 from pydantic import BaseModel, Field
-from typing import Generic, TypeVar, Optional, Any, List
-from datetime import datetime
+from typing import Generic, TypeVar, Optional, Any, Dict, List
+from datetime import datetime, timezone
 
 
 DataT = TypeVar('DataT')
 
 
+def _utcnow() -> datetime:
+    """Timezone-aware UTC now (datetime.utcnow is deprecated)"""
+    return datetime.now(timezone.utc)
+
+
 class ApiResponse(BaseModel, Generic[DataT]):
     """Standard API response wrapper"""
     success: bool = True
     data: Optional[DataT] = None
     message: Optional[str] = None
     error: Optional[str] = None
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=_utcnow)
 
     model_config = {
         "json_schema_extra": {
@@ -30,6 +35,21 @@ class ApiResponse(BaseModel, Generic[DataT]):
     }
 
 
+def api_envelope(data: Any = None, message: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Successful ApiResponse as a plain dict, for endpoints that hand it
+    straight to ORJSONResponse (skipping pydantic validation and
+    jsonable_encoder). data may be an orjson.Fragment of pre-serialized JSON.
+    """
+    return {
+        "success": True,
+        "data": data,
+        "message": message,
+        "error": None,
+        "timestamp": _utcnow()
+    }
+
+
 class PaginationMeta(BaseModel):
     """Pagination metadata"""
     total: int = Field(description="Total number of items")
@@ -70,7 +90,7 @@ class ErrorResponse(BaseModel):
     success: bool = False
     error: str
     detail: Optional[str] = None
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=_utcnow)
 
 
 class HealthResponse(BaseModel):
@@ -78,4 +98,4 @@ class HealthResponse(BaseModel):
     status: str
     database: str
     services: dict
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=_utcnow)
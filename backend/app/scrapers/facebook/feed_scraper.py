@@ -212,7 +212,7 @@ class FacebookFeedScraper(FacebookBaseScraper):
                     continue
 
                 # AI Analysis
-                ai_result = await detector.analyze_text(content)
+                ai_result = detector.analyze_text(content)
 
                 fraud_score = ai_result.get("fraud_score", 0.0)
                 risk_level = ai_result.get("risk_level", "LOW")
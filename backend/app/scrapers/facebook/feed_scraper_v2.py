@@ -354,7 +354,7 @@ class FacebookFeedScraperV2:
         """Process posts with AI fraud detection"""
         logger.info(f"🤖 Analyzing {len(posts)} posts with AI...")
 
-        detector = FraudDetector({'use_gpu': False})
+        detector = FraudDetector()
         fraud_posts = []
 
         for idx, post in enumerate(posts):
@@ -362,7 +362,7 @@ class FacebookFeedScraperV2:
                 content = post.get('content', '')
 
                 # AI Analysis
-                ai_result = await detector.analyze_text(content)
+                ai_result = detector.analyze_text(content)
 
                 fraud_score = ai_result.get("fraud_score", 0.0)
                 risk_level = ai_result.get("risk_level", "LOW")
@@ -78,6 +78,13 @@ class FacebookSearchScraper:
         """Initialize browser and login"""
         logger.info("Starting Facebook search scraper...")
 
+        # Open AI API connections while the browser launches and logs in
+        warmup = asyncio.gather(
+            self.html_detector.warmup(),
+            self.vision_detector.warmup(),
+            self.llama_vision_detector.warmup()
+        )
+
         self.playwright = await async_playwright().start()
 
         # Use Firefox (better macOS compatibility)
@@ -95,6 +102,8 @@ class FacebookSearchScraper:
         # Login to Facebook
         await self._login()
 
+        await warmup
+
     async def _login(self):
         """Login to Facebook"""
         logger.info("Navigating to Facebook...")
@@ -631,11 +640,12 @@ class FacebookSearchScraper:
             logger.error(f"Error creating fraud alert: {str(e)}")
 
     async def stop(self):
-        """Close browser"""
+        """Close browser and AI client sessions"""
         if self.browser:
             await self.browser.close()
         if self.playwright:
             await self.playwright.stop()
+        await self.llama_vision_detector.aclose()
         logger.info("Browser closed")
 
 
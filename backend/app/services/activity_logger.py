@@ -0,0 +1,151 @@
+"""
+Buffered activity logging
+
+Endpoints enqueue audit entries with log_activity() instead of adding an
+ActivityLog row to their own transaction. A background task drains the
+queue and writes entries in multi-row INSERTs, so one commit covers many
+events. Trade-off: entries still queued when the process dies are lost
+(at most ~FLUSH_INTERVAL seconds' worth).
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from loguru import logger
+from sqlalchemy import insert
+
+from app.database import AsyncSessionLocal
+from app.models import ActivityLog
+
+# Flush when this many entries are buffered, or FLUSH_INTERVAL seconds after
+# the first entry of a batch arrived, whichever comes first
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0
+# Bound memory if the database is unreachable; further entries are dropped
+MAX_QUEUE_SIZE = 10000
+# A failed batch is retried this many times, RETRY_DELAY seconds apart,
+# before it is dropped (a batch that can never be written mustn't loop forever)
+WRITE_RETRIES = 2
+RETRY_DELAY = 1.0
+
+_queue: Optional[asyncio.Queue] = None
+_flusher_task: Optional[asyncio.Task] = None
+
+
+def log_activity(
+    action: str,
+    officer_id: Optional[str] = None,
+    resource_type: Optional[str] = None,
+    resource_id: Optional[str] = None,
+    details: Optional[Dict[str, Any]] = None,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+) -> None:
+    """
+    Queue an activity log entry for the background writer. Never blocks.
+    The timestamp is taken now, not when the batch is written.
+    """
+    if _queue is None:
+        logger.warning(f"Activity logger not running, dropping '{action}' entry")
+        return
+
+    entry = {
+        "officer_id": officer_id,
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "details": details,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "timestamp": datetime.utcnow(),
+    }
+
+    try:
+        _queue.put_nowait(entry)
+    except asyncio.QueueFull:
+        logger.error(f"Activity log queue full, dropping '{action}' entry")
+
+
+async def _write_batch(batch: List[Dict[str, Any]]) -> None:
+    """
+    Insert a batch of entries in one statement and commit, retrying on
+    failure. Errors are logged, never raised.
+    """
+    for attempt in range(WRITE_RETRIES + 1):
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(insert(ActivityLog), batch)
+                await session.commit()
+            return
+        except Exception as e:
+            if attempt == WRITE_RETRIES:
+                logger.error(f"Failed to write {len(batch)} activity log entries, dropping them: {e}")
+                return
+            logger.warning(f"Failed to write {len(batch)} activity log entries, retrying: {e}")
+            await asyncio.sleep(RETRY_DELAY)
+
+
+async def _flusher(queue: asyncio.Queue) -> None:
+    """Collect entries into batches and write them until the stop sentinel."""
+    loop = asyncio.get_running_loop()
+
+    while True:
+        entry = await queue.get()
+        if entry is None:
+            return
+
+        batch = [entry]
+        deadline = loop.time() + FLUSH_INTERVAL
+        stopping = False
+
+        while len(batch) < BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                entry = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if entry is None:
+                stopping = True
+                break
+            batch.append(entry)
+
+        await _write_batch(batch)
+        if stopping:
+            return
+
+
+def start_activity_logger() -> None:
+    """
+    Start the background writer.
+    Call during application startup, from the running event loop.
+    """
+    global _queue, _flusher_task
+
+    if _flusher_task is not None:
+        return
+
+    _queue = asyncio.Queue(maxsize=MAX_QUEUE_SIZE)
+    _flusher_task = asyncio.create_task(_flusher(_queue))
+    logger.info("Activity logger started")
+
+
+async def stop_activity_logger() -> None:
+    """
+    Stop the background writer and write any entries still queued.
+    Call during application shutdown.
+    """
+    global _queue, _flusher_task
+
+    if _flusher_task is None:
+        return
+
+    # None is the stop sentinel: everything queued before it gets written
+    queue = _queue
+    _queue = None
+    await queue.put(None)
+    await _flusher_task
+
+    _flusher_task = None
+    logger.info("Activity logger stopped")
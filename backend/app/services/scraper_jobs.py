@@ -0,0 +1,60 @@
+"""
+Scraper jobs
+
+Scraper runs started from the API. They execute on the Celery worker
+(app.worker) when a broker is configured, otherwise as in-process
+background tasks.
+"""
+
+from datetime import datetime
+from loguru import logger
+import orjson
+
+from app.core.cache import cache_set, release_lock
+
+# One scraper run per type at a time (each run drives a headless browser);
+# the TTL frees the lock if a worker dies mid-run
+SCRAPER_LOCK_KEY = "scraper:lock:{scraper_type}"
+SCRAPER_LOCK_TTL = 1800
+# Summary of the last finished run; triggers within this window return it
+SCRAPER_LAST_RESULT_KEY = "scraper:last:{scraper_type}"
+SCRAPER_LAST_RESULT_TTL = 60
+
+
+async def run_facebook_feed_scraper(num_batches: int, batch_size: int, lock_key: str, lock_owner: str):
+    """Run the Facebook feed scraper, then release the scraper lock"""
+    try:
+        from app.scrapers.facebook.feed_scraper import FacebookFeedScraper
+
+        # TODO: Get credentials from environment or config
+        EMAIL = "your_email@example.com"
+        PASSWORD = "your_password"
+
+        scraper = FacebookFeedScraper(
+            email=EMAIL,
+            password=PASSWORD,
+            headless=True,  # Run headless in background
+            batch_size=batch_size
+        )
+
+        logger.info(f"Starting Facebook feed scraper: {num_batches} batches")
+        result = await scraper.scrape_feed(num_batches=num_batches)
+
+        logger.info(f"Scraper completed: {result}")
+
+        if 'error' not in result:
+            summary = {
+                'total_scraped': result.get('total_scraped', 0),
+                'total_fraud_detected': result.get('total_fraud_detected', 0),
+                'finished_at': datetime.utcnow()
+            }
+            await cache_set(
+                SCRAPER_LAST_RESULT_KEY.format(scraper_type='facebook_feed'),
+                orjson.dumps(summary),
+                SCRAPER_LAST_RESULT_TTL
+            )
+
+    except Exception as e:
+        logger.error(f"Background scraper error: {str(e)}")
+    finally:
+        await release_lock(lock_key, lock_owner)
@@ -0,0 +1,97 @@
+"""
+Daily threat counts refresher
+
+The threat dashboard reads per-day alert counts from the daily_threat_counts
+materialized view (created by python -m app.database create-indexes). Alerts are
+inserted by the scrapers, often from another process, so the view is
+refreshed on a timer rather than on write: the heatmap and recent activity
+can lag by up to THREAT_COUNTS_REFRESH_SECONDS.
+
+Every Uvicorn worker runs the timer, but a refresh only happens under a
+Postgres advisory lock (one worker at a time, the others skip that tick),
+and only when the alert total no longer matches the view.
+"""
+
+import asyncio
+from typing import Optional
+from loguru import logger
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+
+# CONCURRENTLY keeps the view readable while it is rebuilt
+REFRESH_QUERY = text("REFRESH MATERIALIZED VIEW CONCURRENTLY daily_threat_counts")
+
+# Transaction-scoped, so it is released on commit or rollback and never
+# leaks onto a pooled connection
+REFRESH_LOCK_KEY = 0x6761757201  # arbitrary; unique to this job
+LOCK_QUERY = text("SELECT pg_try_advisory_xact_lock(:key)")
+
+# Alerts were added (or deleted) since the last refresh. Counting is an
+# index-only scan, far cheaper than rebuilding the view
+STALE_QUERY = text(
+    """SELECT (SELECT COUNT(*) FROM ai_fraud_alerts)
+              <> (SELECT COALESCE(SUM(alert_count), 0) FROM daily_threat_counts)"""
+)
+
+_refresher_task: Optional[asyncio.Task] = None
+
+
+async def refresh_daily_threat_counts() -> None:
+    """
+    Rebuild the daily_threat_counts view, unless another worker is already
+    rebuilding it or it is up to date. Errors are logged.
+    """
+    try:
+        async with AsyncSessionLocal() as session:
+            if not (await session.execute(LOCK_QUERY, {"key": REFRESH_LOCK_KEY})).scalar():
+                logger.debug("Threat counts refresh running in another worker, skipping")
+                return
+            if not (await session.execute(STALE_QUERY)).scalar():
+                return
+            await session.execute(REFRESH_QUERY)
+            await session.commit()
+    except Exception as e:
+        logger.error(f"Failed to refresh daily threat counts: {e}")
+
+
+async def _refresher(interval: float) -> None:
+    """Refresh immediately, then every `interval` seconds until cancelled."""
+    while True:
+        await refresh_daily_threat_counts()
+        await asyncio.sleep(interval)
+
+
+def start_threat_counts_refresher() -> None:
+    """
+    Start the periodic refresh.
+    Call during application startup, from the running event loop.
+    """
+    global _refresher_task
+
+    if _refresher_task is not None:
+        return
+
+    _refresher_task = asyncio.create_task(_refresher(settings.THREAT_COUNTS_REFRESH_SECONDS))
+    logger.info("Threat counts refresher started")
+
+
+async def stop_threat_counts_refresher() -> None:
+    """
+    Stop the periodic refresh.
+    Call during application shutdown.
+    """
+    global _refresher_task
+
+    if _refresher_task is None:
+        return
+
+    _refresher_task.cancel()
+    try:
+        await _refresher_task
+    except asyncio.CancelledError:
+        pass
+
+    _refresher_task = None
+    logger.info("Threat counts refresher stopped")
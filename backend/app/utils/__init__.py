@@ -5,6 +5,7 @@ Utility functions and helpers
 from app.utils.security import (
     hash_password,
     verify_password,
+    password_needs_rehash,
     create_access_token,
     create_refresh_token,
     create_token_pair,
@@ -25,12 +26,24 @@ from app.utils.exceptions import (
     AIException,
 )
 
+from app.utils.auth_cache import (
+    OfficerContext,
+    invalidate_officer_tokens,
+)
+
+from app.utils.pagination import (
+    encode_cursor,
+    decode_cursor,
+    next_cursor,
+)
+
 from app.utils.logger import setup_logger
 
 __all__ = [
     # Security
     "hash_password",
     "verify_password",
+    "password_needs_rehash",
     "create_access_token",
     "create_refresh_token",
     "create_token_pair",
@@ -49,6 +62,15 @@ __all__ = [
     "ScrapingException",
     "AIException",
 
+    # Auth cache
+    "OfficerContext",
+    "invalidate_officer_tokens",
+
+    # Pagination
+    "encode_cursor",
+    "decode_cursor",
+    "next_cursor",
+
     # Logger
     "setup_logger",
 ]
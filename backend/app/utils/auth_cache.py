@@ -0,0 +1,223 @@
+"""
+Access token -> officer cache
+
+get_current_officer resolves a verified access token to an OfficerContext:
+the officer fields, roles and permissions that authorization and the
+profile endpoint need. The context is cached in Redis under a hash of the
+token, so repeat requests with the same token skip the officer, role and
+permission queries. Like app.core.cache this is best-effort: without Redis
+only the in-process L1 below is used.
+
+Entries live at most AUTH_TOKEN_CACHE_TTL seconds and never past the
+token's own expiry. invalidate_officer_tokens drops every cached token of
+an officer (role, status or lock changes, logout).
+
+In front of Redis sits a per-process LRU (L1) holding entries for
+AUTH_L1_TTL seconds, so most requests need no network hop at all.
+Invalidation clears the local L1 only; other worker processes converge
+when their L1 entries expire.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+from loguru import logger
+import orjson
+
+from app.config import settings
+from app.core.cache import get_redis
+
+try:
+    from redis.exceptions import RedisError
+except ImportError:
+    RedisError = OSError
+
+
+AUTH_TOKEN_CACHE_KEY = "auth:tok:{token_hash}"
+AUTH_TOKEN_CACHE_TTL = 60
+# Hashes of an officer's cached tokens, so they can be dropped together
+AUTH_OFFICER_TOKENS_KEY = "auth:officer:{officer_id}:tokens"
+# Valid tokens whose officer no longer exists; kept short
+AUTH_NEGATIVE_CACHE_TTL = 10
+
+# Stored for a token whose officer no longer exists
+_NEGATIVE_ENTRY = b"null"
+
+AUTH_L1_MAXSIZE = 10_000
+AUTH_L1_TTL = 30
+
+# token hash -> (expires_at on the monotonic clock, officer or None).
+# Only touched from the event loop thread, so no lock
+_l1: "OrderedDict[str, Tuple[float, Optional[OfficerContext]]]" = OrderedDict()
+
+
+@dataclass(frozen=True)
+class OfficerContext:
+    """
+    The authenticated officer as seen by dependencies and endpoints.
+    Built from the ORM officer on a cache miss, from the snapshot on a hit.
+    """
+    officer_id: str
+    badge_number: str
+    active: bool
+    locked_until: Optional[datetime]
+    # Sets, so RBAC checks are single hash lookups
+    role_names: FrozenSet[str]
+    minimum_role_level: int
+    # "resource:action" strings; "*" for super_admin
+    permissions: FrozenSet[str]
+    # OfficerResponse fields, as returned by /auth/profile
+    profile: Dict[str, Any]
+
+    @property
+    def is_active(self) -> bool:
+        return self.active
+
+    @property
+    def is_locked(self) -> bool:
+        return self.locked_until is not None and self.locked_until > datetime.utcnow()
+
+    def to_snapshot(self) -> bytes:
+        """Serialize for the cache"""
+        return orjson.dumps({
+            "officer_id": self.officer_id,
+            "badge_number": self.badge_number,
+            "active": self.active,
+            "locked_until": self.locked_until,
+            "role_names": sorted(self.role_names),
+            "minimum_role_level": self.minimum_role_level,
+            "permissions": sorted(self.permissions),
+            "profile": self.profile,
+        })
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> "OfficerContext":
+        """Rebuild from a decoded cache entry"""
+        locked_until = snapshot["locked_until"]
+        return cls(
+            officer_id=snapshot["officer_id"],
+            badge_number=snapshot["badge_number"],
+            active=snapshot["active"],
+            locked_until=datetime.fromisoformat(locked_until) if locked_until else None,
+            role_names=frozenset(snapshot["role_names"]),
+            minimum_role_level=snapshot["minimum_role_level"],
+            permissions=frozenset(snapshot["permissions"]),
+            profile=snapshot["profile"],
+        )
+
+
+def hash_token(token: str) -> str:
+    """Cache key part for a token (the token itself is never stored)"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _l1_get(token_hash: str) -> Tuple[bool, Optional[OfficerContext]]:
+    """L1 lookup; expired entries count as misses and are dropped"""
+    entry = _l1.get(token_hash)
+    if entry is None:
+        return False, None
+    if time.monotonic() > entry[0]:
+        del _l1[token_hash]
+        return False, None
+    _l1.move_to_end(token_hash)
+    return True, entry[1]
+
+
+def _l1_set(token_hash: str, officer: Optional[OfficerContext], ttl: float) -> None:
+    """L1 store, evicting the least recently used entry when full"""
+    _l1[token_hash] = (time.monotonic() + min(ttl, AUTH_L1_TTL), officer)
+    _l1.move_to_end(token_hash)
+    if len(_l1) > AUTH_L1_MAXSIZE:
+        _l1.popitem(last=False)
+
+
+async def get_cached_officer(token_hash: str) -> Tuple[bool, Optional[OfficerContext]]:
+    """
+    Look up a token's officer.
+
+    Returns:
+        Tuple of (hit, officer). On a hit, officer is None if the token's
+        officer was found not to exist.
+    """
+    hit, officer = _l1_get(token_hash)
+    if hit:
+        return hit, officer
+
+    client = get_redis()
+    if client is None:
+        return False, None
+
+    key = AUTH_TOKEN_CACHE_KEY.format(token_hash=token_hash)
+    try:
+        cached = await client.get(key)
+    except (RedisError, OSError) as e:
+        logger.warning(f"Redis GET {key} failed: {e}")
+        return False, None
+
+    if cached is None:
+        return False, None
+    if cached == _NEGATIVE_ENTRY:
+        _l1_set(token_hash, None, AUTH_NEGATIVE_CACHE_TTL)
+        return True, None
+    officer = OfficerContext.from_snapshot(orjson.loads(cached))
+    _l1_set(token_hash, officer, AUTH_L1_TTL)
+    return True, officer
+
+
+async def set_cached_officer(token_hash: str, officer: Optional[OfficerContext], ttl: int) -> None:
+    """
+    Cache a token's officer for ttl seconds (capped at AUTH_TOKEN_CACHE_TTL).
+    None records that the officer doesn't exist, for AUTH_NEGATIVE_CACHE_TTL.
+    Failures are logged, not raised.
+    """
+    _l1_set(token_hash, officer, AUTH_NEGATIVE_CACHE_TTL if officer is None else ttl)
+
+    client = get_redis()
+    if client is None:
+        return
+
+    key = AUTH_TOKEN_CACHE_KEY.format(token_hash=token_hash)
+    try:
+        if officer is None:
+            await client.set(key, _NEGATIVE_ENTRY, ex=min(ttl, AUTH_NEGATIVE_CACHE_TTL))
+            return
+
+        tokens_key = AUTH_OFFICER_TOKENS_KEY.format(officer_id=officer.officer_id)
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.set(key, officer.to_snapshot(), ex=min(ttl, AUTH_TOKEN_CACHE_TTL))
+            pipe.sadd(tokens_key, token_hash)
+            # Outlives every entry it lists
+            pipe.expire(tokens_key, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+            await pipe.execute()
+    except (RedisError, OSError) as e:
+        logger.warning(f"Redis SET {key} failed: {e}")
+
+
+async def invalidate_officer_tokens(officer_id: str) -> None:
+    """
+    Drop all cached tokens of an officer (call after changing the officer,
+    their roles or lock state). Failures are logged, not raised.
+    """
+    for token_hash in [
+        token_hash for token_hash, (_, officer) in _l1.items()
+        if officer is not None and officer.officer_id == officer_id
+    ]:
+        del _l1[token_hash]
+
+    client = get_redis()
+    if client is None:
+        return
+
+    tokens_key = AUTH_OFFICER_TOKENS_KEY.format(officer_id=officer_id)
+    try:
+        token_hashes = await client.smembers(tokens_key)
+        keys = [
+            AUTH_TOKEN_CACHE_KEY.format(token_hash=token_hash.decode())
+            for token_hash in token_hashes
+        ]
+        await client.delete(tokens_key, *keys)
+    except (RedisError, OSError) as e:
+        logger.warning(f"Redis invalidation of {tokens_key} failed: {e}")
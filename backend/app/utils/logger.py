@@ -12,6 +12,10 @@ from app.config import settings
 def setup_logger():
     """
     Configure loguru logger with console and file handlers.
+
+    Both sinks are enqueued: a logging call only puts the record on a queue
+    and a background thread does the (possibly slow) console/disk writes.
+    Call `await logger.complete()` at shutdown to flush it.
     """
     # Remove default handler
     logger.remove()
@@ -22,6 +26,7 @@ def setup_logger():
         format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
         level=settings.LOG_LEVEL,
         colorize=True,
+        enqueue=True,
     )
 
     # File handler with rotation
@@ -35,6 +40,10 @@ def setup_logger():
         rotation=settings.LOG_ROTATION,
         retention=settings.LOG_RETENTION,
         compression=settings.LOG_COMPRESSION,
+        enqueue=True,
+        # No variable values in tracebacks written to disk
+        backtrace=False,
+        diagnose=False,
     )
 
     logger.info("Logger configured successfully")
@@ -0,0 +1,69 @@
+"""
+Keyset (cursor) pagination helpers
+
+A cursor marks the last row of the previous page as "<timestamp>_<id>",
+base64url-encoded so it can go into a query string as-is (an ISO
+timestamp's "+00:00" would otherwise decode to a space). The id breaks
+ties between rows that share a timestamp (e.g. posts inserted in one
+scraper batch), so no row is skipped or repeated.
+"""
+
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """
+    Build the cursor pointing after the given row.
+
+    Args:
+        timestamp: Sort timestamp of the last row on the page
+        row_id: Primary key of that row
+
+    Returns:
+        Opaque cursor string for the next page request
+    """
+    raw = f"{timestamp.isoformat()}_{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Parse a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string from a previous response
+
+    Returns:
+        Tuple of (timestamp, row_id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    # Padding was stripped by encode_cursor; restore it
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    timestamp, _, row_id = raw.rpartition("_")
+    return datetime.fromisoformat(timestamp), int(row_id)
+
+
+def next_cursor(rows: list, limit: int, timestamp_attr: str) -> Optional[str]:
+    """
+    Cursor for the page after `rows`, or None if this was the last page.
+
+    Args:
+        rows: Rows of the current page, in sort order
+        limit: Page size that was requested
+        timestamp_attr: Name of the sort timestamp attribute on each row
+
+    Returns:
+        Cursor string, or None when fewer than `limit` rows came back
+        (or the last row has no timestamp to anchor on)
+    """
+    if len(rows) < limit:
+        return None
+    last = rows[-1]
+    timestamp = getattr(last, timestamp_attr)
+    if timestamp is None:
+        return None
+    return encode_cursor(timestamp, last.id)
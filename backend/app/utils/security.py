@@ -2,13 +2,16 @@
 Security utilities for password hashing and JWT tokens
 """
 
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+import time
 from jose import JWTError, jwt
 import bcrypt
 from loguru import logger
 
 from app.config import settings
+from app.utils.auth_cache import hash_token
 
 
 # ==================== Password Hashing ====================
@@ -25,8 +28,8 @@ def hash_password(password: str) -> str:
     """
     # Convert password to bytes
     password_bytes = password.encode('utf-8')
-    # Generate salt and hash
-    salt = bcrypt.gensalt()
+    # Generate salt (at the configured cost) and hash
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_COST)
     hashed = bcrypt.hashpw(password_bytes, salt)
     # Return as string
     return hashed.decode('utf-8')
@@ -54,6 +57,23 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a bcrypt hash uses a lower cost than BCRYPT_COST.
+
+    Args:
+        hashed_password: Stored hash ("$2b$<cost>$<salt+hash>")
+
+    Returns:
+        True if the hash should be regenerated at the current cost
+    """
+    try:
+        cost = int(hashed_password.split('$')[2])
+    except (IndexError, ValueError):
+        return False
+    return cost < settings.BCRYPT_COST
+
+
 # ==================== JWT Token Creation ====================
 
 def create_access_token(
@@ -191,29 +211,67 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def verify_access_token(token: str) -> Optional[Dict[str, Any]]:
+# sha256(token) -> (expires_at on the wall clock, payload or None). Keyed
+# on the hash so entries stay small whatever the clients send. Only
+# touched from the event loop thread, so no lock
+_ACCESS_TOKEN_CACHE_MAXSIZE = 8192
+# Rejections are cached briefly, so replayed bad tokens skip the verifier
+# without piling up
+_INVALID_TOKEN_CACHE_TTL = 10
+_access_token_cache: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+
+
+def _decode_access_token(token: str, token_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    Signature and type check, done once per distinct token: clients send
+    the same access token on every request until it expires. Callers must
+    not modify the returned payload.
+    """
+    now = time.time()
+    entry = _access_token_cache.get(token_hash)
+    if entry is not None:
+        if entry[0] > now:
+            _access_token_cache.move_to_end(token_hash)
+            return entry[1]
+        del _access_token_cache[token_hash]
+
+    payload = decode_token(token)
+
+    if payload and payload.get("type") != "access":
+        logger.warning("Token is not an access token")
+        payload = None
+
+    if payload:
+        expires_at = payload.get("exp") or now + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    else:
+        payload = None
+        expires_at = now + _INVALID_TOKEN_CACHE_TTL
+
+    _access_token_cache[token_hash] = (expires_at, payload)
+    if len(_access_token_cache) > _ACCESS_TOKEN_CACHE_MAXSIZE:
+        _access_token_cache.popitem(last=False)
+    return payload
+
+
+def verify_access_token(token: str, token_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Verify an access token and return payload.
 
     Args:
         token: Access token to verify
+        token_hash: hash_token(token), if the caller already has it
 
     Returns:
         Token payload if valid, None otherwise
     """
-    payload = decode_token(token)
+    payload = _decode_access_token(token, token_hash or hash_token(token))
 
     if not payload:
         return None
 
-    # Verify token type
-    if payload.get("type") != "access":
-        logger.warning("Token is not an access token")
-        return None
-
-    # Verify expiration (jose already checks this, but double-check)
+    # Verify expiration on every call: a cached payload outlives its token
     exp = payload.get("exp")
-    if exp and datetime.utcfromtimestamp(exp) < datetime.utcnow():
+    if exp and exp < time.time():
         logger.warning("Token has expired")
         return None
 
@@ -243,6 +301,12 @@ def verify_refresh_token(token: str) -> Optional[Dict[str, Any]]:
     return payload
 
 
+# Bounds on the Authorization header: anything outside can't hold one of our
+# tokens and is rejected before any parsing
+MIN_AUTHORIZATION_LENGTH = 20
+MAX_AUTHORIZATION_LENGTH = 4096
+
+
 def extract_token_from_header(authorization: str) -> Optional[str]:
     """
     Extract JWT token from Authorization header.
@@ -253,11 +317,16 @@ def extract_token_from_header(authorization: str) -> Optional[str]:
     Returns:
         Extracted token or None if invalid format
     """
-    if not authorization:
+    if (
+        not authorization
+        or not MIN_AUTHORIZATION_LENGTH <= len(authorization) <= MAX_AUTHORIZATION_LENGTH
+    ):
         return None
 
-    parts = authorization.split()
-    if len(parts) != 2 or parts[0].lower() != "bearer":
+    # One split at the first space; the scheme is case-insensitive (RFC 6750)
+    scheme, _, token = authorization.partition(" ")
+    token = token.strip()
+    if scheme.lower() != "bearer" or not token or " " in token:
         return None
 
-    return parts[1]
+    return token
@@ -0,0 +1,53 @@
+"""
+GAUR Celery Worker
+Runs scraper jobs outside the API process, so headless browsers don't
+compete with request handling for memory and event-loop time.
+
+Start with:
+    celery -A app.worker worker --concurrency=2
+"""
+
+import asyncio
+from typing import Optional
+
+from app.ai.openai_client import close_openai_clients
+from app.config import settings
+from app.core.cache import close_redis
+from app.services.scraper_jobs import run_facebook_feed_scraper
+
+try:
+    from celery import Celery
+except ImportError:
+    Celery = None
+
+
+# Explicit opt-in: REDIS_URL alone (the response cache) must not route jobs to
+# a broker nobody consumes, which would leave them queued with the lock held
+BROKER_URL: Optional[str] = settings.CELERY_BROKER_URL
+
+# Both stay None when Celery isn't installed or no broker is configured
+celery_app = None
+facebook_feed_scraper_task = None
+
+if Celery is not None and BROKER_URL:
+    celery_app = Celery("gaur", broker=BROKER_URL)
+    celery_app.conf.update(
+        task_serializer="json",
+        accept_content=["json"],
+        # A scraper run is long; don't reserve queued jobs on a busy worker
+        worker_prefetch_multiplier=1,
+        task_ignore_result=True,
+    )
+
+    @celery_app.task(name="scrapers.facebook_feed")
+    def facebook_feed_scraper_task(num_batches: int, batch_size: int, lock_key: str, lock_owner: str):
+        """Celery entry point for run_facebook_feed_scraper"""
+        async def _run():
+            try:
+                await run_facebook_feed_scraper(num_batches, batch_size, lock_key, lock_owner)
+            finally:
+                # The Redis and OpenAI clients are bound to this task's event loop
+                await close_openai_clients()
+                await close_redis()
+
+        asyncio.run(_run())
@@ -0,0 +1,62 @@
+"""
+Fraud pattern matching must give the same result whether the fused pattern
+is compiled with RE2 or with Python's re (RE2 is optional, so both run in
+production)
+"""
+
+import re
+
+import pytest
+
+from app.ai.fraud_detector import _FRAUD_PATTERNS, FraudDetector
+
+re2 = pytest.importorskip("re2")
+
+_ALTERNATION = '(?i)' + '|'.join(f"(?P<{p['name']}>{p['pattern']})" for p in _FRAUD_PATTERNS)
+
+# Mixed Devanagari / Latin posts, with phone numbers glued to letters of
+# either script, split by punctuation, or inside longer digit runs
+MIXED_SCRIPT_SAMPLES = (
+    "9876543210रिटर्न",
+    "कॉल9876543210",
+    "कॉल 9876543210 करें",
+    "call9876543210",
+    "call 9876543210 now",
+    "संपर्क: 9876543210।",
+    "+91 9876543210 पर कॉल करें",
+    "+91-9876543210गारंटी",
+    "id_9876543210",
+    "98765432101",
+    "होटल बुकिंग 9876543210, 90% off, UPI",
+    "गारंटीड 100% रिटर्न, जल्दी करें urgent",
+    "9876543210",
+    "",
+)
+
+
+def _detector(pattern) -> FraudDetector:
+    detector = FraudDetector()
+    detector._fused_pattern = pattern
+    return detector
+
+
+@pytest.mark.parametrize("text", MIXED_SCRIPT_SAMPLES)
+def test_re2_matches_re_on_mixed_script(text):
+    re_detector = _detector(re.compile(_ALTERNATION))
+    re2_detector = _detector(re2.compile(_ALTERNATION))
+
+    assert re2_detector._match_patterns(text) == re_detector._match_patterns(text)
+
+
+@pytest.mark.parametrize("text,expected", (
+    ("9876543210रिटर्न", False),
+    ("कॉल9876543210", False),
+    ("98765432101", False),
+    ("कॉल 9876543210 करें", True),
+    ("संपर्क: 9876543210।", True),
+    ("+91 9876543210 पर", True),
+))
+def test_phone_number_needs_word_boundaries(text, expected):
+    phone_idx = [p['name'] for p in _FRAUD_PATTERNS].index('phone_number_in_text')
+
+    assert (phone_idx in FraudDetector()._match_patterns(text)) is expected